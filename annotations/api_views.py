@@ -4,21 +4,21 @@ from typing import Dict
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.postgres.aggregates import ArrayAgg
-from django.db import reset_queries
 from django.db.models import Count, Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from elasticsearch import Elasticsearch
 from elasticsearch_dsl import Q, Search
-from rest_framework import filters, pagination, status, viewsets
+from rest_framework import filters, status, viewsets
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
 from rest_framework.permissions import DjangoObjectPermissions
 from rest_framework.response import Response
 
 from belege.models import Beleg
-from belege.query_utils import log_query_count
+from belege.pagination import CustomPagination, LargeResultsSetPagination
+from dboeannotation.api_cache import CachedResponseMixin
 from dboeannotation.metadata import PROJECT_METADATA as PM
 
 from .filters import (
@@ -44,6 +44,7 @@ from .serializers import (
     AnnotationSerializer,
     AutorArtikelSerializer,
     CategorySerializer,
+    CollectionBelegSerializer,
     CollectionSerializer,
     EditOfArticleLemmaSerializer,
     EditOfArticleSerializer,
@@ -73,12 +74,6 @@ class CustomObtainAuthToken(ObtainAuthToken):
         return Response({"token": token.key, "id": token.user_id})
 
 
-class LargeResultsSetPagination(pagination.PageNumberPagination):
-    page_size = 25
-    page_size_query_param = "page_size"
-    max_page_size = 10000
-
-
 class UserViewSet(viewsets.ModelViewSet):
     """
     get:
@@ -101,15 +96,8 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserListSerializer
         return UserSerializer
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """
         get:
         Return a list of all the existing categories.
@@ -119,21 +107,15 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
     """
 
+    cache_group = "categories"
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = LargeResultsSetPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = CategoryFilter
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
 
-
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """
         get:
         Return a list of all tags.
@@ -143,6 +125,7 @@ class TagViewSet(viewsets.ModelViewSet):
 
     """
 
+    cache_group = "tags"
     queryset = Tag.objects.annotate(
         belege_ids=ArrayAgg("belege__dboe_id", distinct=True)
     ).annotate(belege_count=Count("belege"))
@@ -151,13 +134,6 @@ class TagViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TagFilter
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class LemmaViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
@@ -172,7 +148,14 @@ class LemmaViewSet(viewsets.ModelViewSet):
             queryset = Lemma.objects.exclude(
                 id__in=Edit_of_article.objects.filter(lemma__isnull=False)
             )
-        return queryset
+        # the current tasks of the lemmata and their simplices, see LemmaSerializer.get_assigned_task
+        current_tasks = Edit_of_article.objects.filter(current=True).select_related(
+            "user"
+        )
+        return queryset.select_related("simplex").prefetch_related(
+            Prefetch("lemma", queryset=current_tasks, to_attr="current_tasks"),
+            Prefetch("simplex__lemma", queryset=current_tasks, to_attr="current_tasks"),
+        )
 
     queryset = Lemma.objects.all()
     serializer_class = LemmaSerializer
@@ -180,13 +163,6 @@ class LemmaViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = LemmaFilter
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class EditOfArticleViewSet(viewsets.ModelViewSet):
     queryset = Edit_of_article.objects.all()
@@ -206,13 +182,6 @@ class EditOfArticleViewSet(viewsets.ModelViewSet):
         elif parameter == "2":
             return EditOfArticleUserSerializer
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class AutorArtikelViewSet(viewsets.ModelViewSet):
     queryset = Autor_Artikel.objects.all()
@@ -220,13 +189,6 @@ class AutorArtikelViewSet(viewsets.ModelViewSet):
     pagination_class = LargeResultsSetPagination
     filter_backends = (DjangoFilterBackend,)
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class Es_documentViewSet(viewsets.ModelViewSet):
     """
@@ -258,8 +220,8 @@ class Es_documentViewSet(viewsets.ModelViewSet):
         if isinstance(es, str) and len(es) > 1 and es != "none":
             return qs.filter(es_id__istartswith=es)
         if bool(self.request.query_params.get("cache_only")) is True:
-            return qs.exclude(xml="")
-        return qs
+            return qs.exclude(xml="").select_related("xml_modified_by")
+        return qs.prefetch_related("tag", "in_collections")
 
     def get_serializer_class(self):
         es = str(self.request.query_params.get("es_id__startswith")).lower()
@@ -330,43 +292,66 @@ class Es_documentViewSet(viewsets.ModelViewSet):
 
         return Response(status=status.HTTP_200_OK)
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class CollectionViewSet(viewsets.ModelViewSet):
+    # building missing representations of the Belege takes a constant number of queries per page
+    query_budget = 20
     queryset = (
         Collection.objects.annotate(beleg_count=Count("beleg"))
         .select_related("category", "created_by", "lemma_id")
         .prefetch_related(
-            Prefetch(
-                "beleg",
-                queryset=Beleg.objects.with_related(),
-            ),
             "curator",
             "es_document",
             "es_document__tag",
             "annotations",
         )
+        # Meta.ordering is not applied to aggregating queries
+        .order_by("id")
     )
     serializer_class = CollectionSerializer
     pagination_class = LargeResultsSetPagination
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = CollectionFilter
 
+    def get_queryset(self):
+        if self.action == "belege":
+            return Collection.objects.order_by("id")
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            # only the ids of the Belege are serialized, see belege()
+            queryset = queryset.prefetch_related(
+                Prefetch("beleg", queryset=Beleg.objects.only("pk"))
+            )
+        return queryset
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
+    @extend_schema(
+        summary="Belege of a collection",
+        description="Returns a paginated list of the Belege of the collection "
+        "in the Beleg serialization, with the id, name and color of their tags.",
+        responses=CollectionBelegSerializer(many=True),
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        serializer_class=CollectionBelegSerializer,
+        pagination_class=CustomPagination,
+        filter_backends=(),
+    )
+    def belege(self, request, pk=None):
+        collection = self.get_object()
+        queryset = (
+            Beleg.objects.filter(collection=collection)
+            .defer("orig_xml")
+            .prefetch_related("tag")
+            .order_by("pk")
+        )
+        page = self.paginate_queryset(queryset)
+        Beleg.objects.refresh_representations(page)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class AnnotationViewSet(viewsets.ModelViewSet):
@@ -390,13 +375,6 @@ class AnnotationViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 @extend_schema(responses={200: {}})
 @api_view()
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AnnotationsConfig(AppConfig):
     name = "annotations"
+
+    def ready(self):
+        import annotations.signals  # noqa: F401
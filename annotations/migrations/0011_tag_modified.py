@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "annotations",
+            "0010_alter_annotation_options_alter_autor_artikel_options_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tag",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annotations", "0011_tag_modified"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tag",
+            name="name",
+            field=models.CharField(max_length=255, verbose_name="Tag"),
+        ),
+    ]
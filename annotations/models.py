@@ -30,6 +30,17 @@ class Tag(models.Model):
     name = models.CharField(max_length=255, verbose_name="Tag")
     color = models.CharField(max_length=255, blank=True)
     meta = models.JSONField(null=True)
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
+    def save(self, *args, **kwargs):
+        self.modified = timezone.now()
+        return super(Tag, self).save(*args, **kwargs)
 
     def __str__(self):
         return self.name
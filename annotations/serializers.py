@@ -3,8 +3,10 @@ from xml.etree import ElementTree as ET
 from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
 from belege.models import Beleg
+from belege.serializers import BelegSerializer
 
 from .models import (
     Annotation,
@@ -241,26 +243,24 @@ class LemmaSerializer(serializers.HyperlinkedModelSerializer):
     assigned_task = serializers.SerializerMethodField()
 
     def get_assigned_task(self, lemma) -> dict | None:
-        curr_lemma = Lemma.objects.get(id=lemma.id)
-        if curr_lemma.simplex is not None:
-            lemma = curr_lemma.simplex
-        try:
-            tasks = Edit_of_article.objects.filter(
-                lemma=Lemma.objects.get(id=lemma.id), current=True
-            ).first()
-            ser_context = {"request": self.context.get("request")}
-            result = EditOfArticleSerializer(tasks, context=ser_context)
-            user = result.data["user"]
-            if user is None:
-                return None
-            else:
-                return {
-                    "user": result.data["user"],
-                    "user_name": result.data["user_name"],
-                    "task": result.data["url"],
-                }
-        except Edit_of_article.DoesNotExist:
+        """The user working on the current task of the lemma or its simplex.
+
+        Reads the tasks prefetched by ``LemmaViewSet.get_queryset`` as ``current_tasks``.
+        """
+        if lemma.simplex is not None:
+            lemma = lemma.simplex
+        tasks = getattr(lemma, "current_tasks", None)
+        if tasks is None:
+            tasks = list(lemma.lemma.filter(current=True).select_related("user"))
+        if not tasks or tasks[0].user is None:
             return None
+        task = tasks[0]
+        request = self.context.get("request")
+        return {
+            "user": reverse("user-detail", args=[task.user_id], request=request),
+            "user_name": task.user.username,
+            "task": reverse("edit_of_article-detail", args=[task.pk], request=request),
+        }
 
     class Meta:
         model = Lemma
@@ -321,18 +321,6 @@ class CollectionSerializer(serializers.HyperlinkedModelSerializer):
         except AttributeError:
             return ""
 
-    def get_beleg(self, obj):
-        docs = []
-        for x in obj.beleg.all():
-            item = x.build_representation()
-            # Add tags to the representation
-            item["tags"] = [
-                {"name": tag.name, "color": tag.color, "id": tag.id}
-                for tag in x.tag.all()
-            ]
-            docs.append(item)
-        return docs
-
     def get_tags(self, obj) -> list:
         docs = obj.es_document.all()
         tags = {}
@@ -350,6 +338,18 @@ class CollectionSerializer(serializers.HyperlinkedModelSerializer):
         #     self.fields.pop("tags", None)
 
 
+class CollectionBelegSerializer(BelegSerializer):
+    """A Beleg of a collection, with the id and color of its tags."""
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+        ret["tags"] = [
+            {"name": tag.name, "color": tag.color, "id": tag.id}
+            for tag in instance.tag.all()
+        ]
+        return ret
+
+
 class AnnotationSerializer(serializers.HyperlinkedModelSerializer):
     created_by = serializers.StringRelatedField()
 
@@ -0,0 +1,38 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from annotations.models import Annotation, Category, Collection, Tag
+from belege.models import Beleg
+from dboeannotation.api_cache import invalidate_on_commit
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Annotation)
+@receiver(post_delete, sender=Annotation)
+def invalidate_categories(sender, **kwargs):
+    invalidate_on_commit("categories")
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(sender, **kwargs):
+    invalidate_on_commit("tags", "stats")
+
+
+@receiver(m2m_changed, sender=Beleg.tag.through)
+def invalidate_tagged_belege(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_on_commit("tags")
+
+
+@receiver(post_delete, sender=Beleg)
+def invalidate_deleted_beleg(sender, **kwargs):
+    """The links to tags are deleted without m2m_changed"""
+    invalidate_on_commit("tags")
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def invalidate_collections(sender, **kwargs):
+    invalidate_on_commit("stats")
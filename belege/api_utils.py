@@ -1,3 +1,8 @@
+from functools import lru_cache
+
+from django import forms
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.forms import TextInput
 from django_filters import UnknownFieldBehavior
@@ -18,6 +23,50 @@ def get_verbose_name(model, field):
         return f"no verbose_name provided for {model}.{field}"
 
 
+def get_search_fields(model):
+    """Names of the fields of ``model`` with a trigram index, which are searched by substring."""
+    return [
+        index.fields[0]
+        for index in model._meta.indexes
+        if isinstance(index, GinIndex) and "gin_trgm_ops" in index.opclasses
+    ]
+
+
+class RelatedPkField(forms.CharField):
+    """Primary key of an object of ``related_model``, checked with one ``exists()``."""
+
+    default_error_messages = {
+        "invalid_choice": "Select a valid choice. That choice is not one of the available choices.",
+    }
+
+    def __init__(self, *, related_model, **kwargs):
+        self.related_model = related_model
+        super().__init__(**kwargs)
+
+    def clean(self, value):
+        value = super().clean(value)
+        if value in self.empty_values:
+            return value
+        try:
+            exists = self.related_model._default_manager.filter(pk=value).exists()
+        except (ValueError, TypeError, ValidationError):
+            exists = False
+        if not exists:
+            raise ValidationError(
+                self.error_messages["invalid_choice"], code="invalid_choice"
+            )
+        return value
+
+
+class RelatedPkFilter(filters.Filter):
+    """Filters a ForeignKey or ManyToManyField by the primary key of the related object.
+
+    Unlike ``ModelChoiceFilter``, the related object is not loaded.
+    """
+
+    field_class = RelatedPkField
+
+
 def filter_by_ids(queryset, name, value):
     values = value.split(",")
     return queryset.filter(dboe_id__in=values)
@@ -26,14 +75,23 @@ def filter_by_ids(queryset, name, value):
 def get_filterset_for_model(model_class, fields=None):
     """Returns a FilterSet class for the given model_class.
 
+    The classes are built once per model_class and fields.
+
     Args:
         model_class: The Django model class to create a filterset for.
         fields: Optional list of field names to include. If None or empty, all fields are processed.
+
+    The fields with a trigram index (``search_fields`` of the returned class) are always
+    included and filtered with ``ILIKE``, which uses the index.
     """
-    if fields is None:
-        fields = []
+    return build_filterset(model_class, tuple(fields or ()))
+
 
+@lru_cache(maxsize=None)
+def build_filterset(model_class, fields):
     class DynamicFilterSet(filters.FilterSet):
+        search_fields = tuple(get_search_fields(model_class))
+
         @classmethod
         def get_filters(cls):
             """Override to add dynamic filters before schema generation."""
@@ -63,10 +121,21 @@ def get_filterset_for_model(model_class, fields=None):
                 field_name = field.name
 
                 # Skip field if fields list is provided and field is not in it
-                if fields and field_name not in fields:
+                if (
+                    fields
+                    and field_name not in fields
+                    and field_name not in cls.search_fields
+                ):
                     continue
 
-                if isinstance(
+                if field_name in cls.search_fields:
+                    filters_dict[field_name] = filters.CharFilter(
+                        field_name=field_name,
+                        lookup_expr="ilike_contains",
+                        label=field.verbose_name,
+                        help_text=f"Substring search (case insensitive). {field.help_text}".strip(),
+                    )
+                elif isinstance(
                     field, (models.CharField, models.TextField, models.BooleanField)
                 ):
                     filters_dict[f"{field_name}"] = filters.CharFilter(
@@ -76,9 +145,9 @@ def get_filterset_for_model(model_class, fields=None):
                         help_text=field.help_text,
                     )
                 elif isinstance(field, (models.ForeignKey, models.ManyToManyField)):
-                    filters_dict[field_name] = filters.ModelChoiceFilter(
+                    filters_dict[field_name] = RelatedPkFilter(
                         field_name=field_name,
-                        queryset=field.related_model.objects.all(),
+                        related_model=field.related_model,
                         label=field.verbose_name,
                         help_text=f"Enter ID for {field.verbose_name}",
                         widget=TextInput(
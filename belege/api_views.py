@@ -1,12 +1,22 @@
-from django.conf import settings
-from django.db import reset_queries
-from drf_spectacular.utils import OpenApiExample, extend_schema
+from itertools import batched
+
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiParameter,
+    OpenApiResponse,
+    extend_schema,
+)
 from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from belege.api_utils import get_filterset_for_model
+from belege.conditional import beleg_version, citation_version, conditional
+from belege.export import export_documents, filter_belege, streaming_response
 from belege.models import (
     AnmerkungLautung,
     Beleg,
@@ -17,7 +27,7 @@ from belege.models import (
     LehnWort,
     Sense,
 )
-from belege.query_utils import log_query_count
+from belege.pagination import CustomPagination
 from belege.serializers import (
     AnmerkungLautungSerializer,
     BelegFacsSerializer,
@@ -28,12 +38,11 @@ from belege.serializers import (
     LehnWortSerializer,
     SenseSerializer,
 )
+from dboeannotation.renderers import dumps
 
-
-class CustomPagination(PageNumberPagination):
-    page_size = 50
-    max_page_size = 50
-    page_size_query_param = "page_size"
+# limits of the bulk endpoint: ids per request and Belege loaded per query
+BULK_MAX_IDS = 5000
+BULK_CHUNK_SIZE = 500
 
 
 class BelegFacsViewset(viewsets.ModelViewSet):
@@ -42,13 +51,6 @@ class BelegFacsViewset(viewsets.ModelViewSet):
     serializer_class = BelegFacsSerializer
     filterset_class = get_filterset_for_model(BelegFacs)
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class FacsimileViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPagination
@@ -56,13 +58,6 @@ class FacsimileViewSet(viewsets.ModelViewSet):
     serializer_class = FacsimilieSerializer
     filterset_class = get_filterset_for_model(Facsimile)
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class BelegViewSetElasticSearch(
     mixins.RetrieveModelMixin,
@@ -71,16 +66,27 @@ class BelegViewSetElasticSearch(
     viewsets.GenericViewSet,
 ):
     pagination_class = CustomPagination
-    queryset = Beleg.objects.with_related()
+    # building missing representations takes a constant number of queries per page
+    query_budget = 20
+    queryset = Beleg.objects.defer("orig_xml")
     filterset_class = get_filterset_for_model(Beleg, fields=["dboe_id", "collection"])
     serializer_class = BelegSerializer
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            Beleg.objects.refresh_representations(page)
+        return page
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method == "GET":
+            Beleg.objects.refresh_representations([instance])
+        return instance
+
+    @method_decorator(conditional(beleg_version))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     @extend_schema(
         summary="Filter Beleg objects by a list of IDs",
@@ -110,21 +116,115 @@ class BelegViewSetElasticSearch(
     )
     @action(detail=False, methods=["post"], permission_classes=[])
     def filter_by_ids(self, request):
-        reset_queries()
         ids = request.data.get("ids", [])
         queryset = self.filter_queryset(self.get_queryset().filter(dboe_id__in=ids))
 
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-        else:
-            serializer = self.get_serializer(queryset, many=True)
-            response = Response(serializer.data)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(
+        summary="Fetch Beleg objects by a list of IDs as NDJSON",
+        description=f"Streams the Beleg objects with the provided dboe_id values (at most {BULK_MAX_IDS}) "
+        "as newline delimited JSON, one Beleg per line in the order of the request. "
+        'The last line lists the IDs which were not found, e.g. {"missing": ["b120_qdbn-d16e2"]}.',
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "maxItems": BULK_MAX_IDS,
+                        "description": "List of dboe_id values to fetch",
+                    }
+                },
+                "required": ["ids"],
+            }
+        },
+        responses={
+            (200, "application/x-ndjson"): OpenApiResponse(
+                response=OpenApiTypes.STR,
+                description="One serialized Beleg per line, followed by the missing IDs",
+            )
+        },
+        examples=[
+            OpenApiExample(
+                "Example request",
+                value={"ids": ["b120_qdbn-d16e2", "b120_qdbn-d16e30"]},
+                request_only=True,
+            )
+        ],
+    )
+    @action(detail=False, methods=["post"], permission_classes=[])
+    def bulk(self, request):
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(x, str) for x in ids):
+            raise ValidationError({"ids": "Expected a list of dboe_id values."})
+        if len(ids) > BULK_MAX_IDS:
+            raise ValidationError({"ids": f"At most {BULK_MAX_IDS} IDs are allowed."})
+        return StreamingHttpResponse(
+            self.stream_belege(list(dict.fromkeys(ids))),
+            content_type="application/x-ndjson",
+        )
 
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
+    def stream_belege(self, ids):
+        """Yield the serialized Belege of ``ids`` as NDJSON, loaded in chunks."""
+        serializer = self.get_serializer()
+        missing = []
+        for chunk in batched(ids, BULK_CHUNK_SIZE):
+            belege = {x.pk: x for x in self.get_queryset().filter(pk__in=chunk)}
+            Beleg.objects.refresh_representations(belege.values())
+            lines = []
+            for dboe_id in chunk:
+                if dboe_id in belege:
+                    lines.append(dumps(serializer.to_representation(belege[dboe_id])))
+                else:
+                    missing.append(dboe_id)
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+        yield dumps({"missing": missing}) + b"\n"
+
+    @extend_schema(
+        summary="Export Beleg objects as NDJSON",
+        description="Streams the OpenSearch documents of all Belege, or of the Belege of a collection, "
+        "a tag and/or a Sigle, as newline delimited JSON ordered by dboe_id. The response is gzip "
+        "compressed if the client accepts it.",
+        parameters=[
+            OpenApiParameter(
+                "collection", OpenApiTypes.INT, description="Collection ID"
+            ),
+            OpenApiParameter("tag", OpenApiTypes.INT, description="Tag ID"),
+            OpenApiParameter(
+                "sigle",
+                OpenApiTypes.STR,
+                description="Sigle, a Bundesland or region includes the Siglen within",
+            ),
+        ],
+        responses={
+            (200, "application/x-ndjson"): OpenApiResponse(
+                response=OpenApiTypes.STR, description="One document per line"
+            )
+        },
+    )
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        params = request.query_params
+        for name in ("collection", "tag"):
+            if params.get(name) and not params[name].isdigit():
+                raise ValidationError({name: "Expected a numeric ID."})
+        queryset = filter_belege(
+            Beleg.objects.all(),
+            collection=params.get("collection"),
+            tag=params.get("tag"),
+            sigle=params.get("sigle"),
+        )
+        return streaming_response(
+            request, export_documents(queryset), "application/x-ndjson", "belege.jsonl"
+        )
 
 
 class CitationViewSet(
@@ -141,12 +241,9 @@ class CitationViewSet(
     lookup_field = "dboe_id"
     lookup_value_regex = r"[^/]+"
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
+    @method_decorator(conditional(citation_version))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class LautungViewSet(
@@ -163,13 +260,6 @@ class LautungViewSet(
     lookup_field = "dboe_id"
     lookup_value_regex = r"[^/]+"
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class LehnwortViewSet(
     mixins.RetrieveModelMixin,
@@ -185,13 +275,6 @@ class LehnwortViewSet(
     lookup_field = "dboe_id"
     lookup_value_regex = r"[^/]+"
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class SenseViewSet(
     mixins.RetrieveModelMixin,
@@ -207,13 +290,6 @@ class SenseViewSet(
     lookup_field = "dboe_id"
     lookup_value_regex = r"[^/]+"
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class AnmerkungLautungViewSet(
     mixins.RetrieveModelMixin,
@@ -230,10 +306,3 @@ class AnmerkungLautungViewSet(
     serializer_class = AnmerkungLautungSerializer
     lookup_field = "dboe_id"
     lookup_value_regex = r"[^/]+"
-
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BelegeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "belege"
+
+    def ready(self):
+        import belege.lookups  # noqa: F401
+        import belege.signals  # noqa: F401
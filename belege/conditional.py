@@ -0,0 +1,77 @@
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from belege.models import Beleg, Citation
+
+
+def conditional(version_func):
+    """Answer GET and HEAD requests with 304 Not Modified if the record is unchanged.
+
+    Like ``django.views.decorators.http.condition``, but ``version_func`` is
+    called once with the URL kwargs and returns ``(last_modified, etag)`` of
+    the record, or ``None`` if there is none. The view is only called if the
+    client's ``If-None-Match``/``If-Modified-Since`` do not match.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            version = version_func(**kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+            last_modified, etag = version
+            etag = quote_etag(etag)
+            timestamp = int(last_modified.timestamp())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault("ETag", etag)
+                response.headers.setdefault("Last-Modified", http_date(timestamp))
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def beleg_version(pk, **kwargs):
+    """``Beleg.modified`` is also bumped by changes to children, tags and siglen."""
+    modified = Beleg.objects.filter(pk=pk).values_list("modified", flat=True).first()
+    if modified is None:
+        return None
+    return modified, f"{pk}-{modified.timestamp()}"
+
+
+def citation_version(dboe_id, **kwargs):
+    modified = (
+        Citation.objects.filter(pk=dboe_id).values_list("modified", flat=True).first()
+    )
+    if modified is None:
+        return None
+    return modified, f"{dboe_id}-{modified.timestamp()}"
+
+
+def tei_version(pk, **kwargs):
+    """The TEI view also renders the annotations of the citations of the Beleg."""
+    row = (
+        Beleg.objects.filter(pk=pk)
+        .annotate(
+            annotations=Count("citations__annotation"),
+            annotated=Max("citations__annotation__updated_at"),
+        )
+        .values_list("modified", "annotations", "annotated")
+        .first()
+    )
+    if row is None:
+        return None
+    modified, annotations, annotated = row
+    last_modified = max(modified, annotated or modified)
+    return last_modified, f"tei-{pk}-{last_modified.timestamp()}-{annotations}"
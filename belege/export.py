@@ -0,0 +1,94 @@
+import re
+from itertools import batched
+
+from django.db.models import Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from belege.models import Beleg
+from belege.utils import transform_records
+from dboeannotation.renderers import dumps
+from siglen.models import BelegSigle
+
+# Belege read per query; only one batch is held in memory at a time
+EXPORT_CHUNK_SIZE = 1000
+# the TEI export prefetches all related objects, so it reads smaller batches
+TEI_CHUNK_SIZE = 500
+# placeholder for the entries in the rendered belege/tei_corpus.j2
+ENTRIES = "<!-- entries -->"
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+def filter_belege(queryset, collection=None, tag=None, sigle=None):
+    """Restrict ``queryset`` to the Belege of a collection, a tag and/or a Sigle.
+
+    A Sigle matches the Belege linked to it and, for a Bundesland or a region,
+    the Belege linked to any Sigle within it.
+    """
+    if collection:
+        queryset = queryset.filter(collection=collection)
+    if tag:
+        queryset = queryset.filter(tag=tag)
+    if sigle:
+        queryset = queryset.filter(
+            Exists(
+                BelegSigle.objects.filter(
+                    Q(sigle=sigle)
+                    | Q(sigle__bl=sigle)
+                    | Q(sigle__gr=sigle)
+                    | Q(sigle__kr=sigle),
+                    beleg=OuterRef("pk"),
+                )
+            )
+        )
+    return queryset
+
+
+def export_documents(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the OpenSearch documents of the Belege of ``queryset`` as NDJSON.
+
+    The Belege are read in chunks of ``chunk_size`` with a server side cursor;
+    missing representations are built and stored on the way. Every chunk of
+    lines is yielded as one bytestring.
+    """
+    belege = queryset.defer("orig_xml").order_by("dboe_id")
+    for batch in batched(belege.iterator(chunk_size=chunk_size), chunk_size):
+        Beleg.objects.refresh_representations(batch)
+        documents = transform_records(x.representation for x in batch)
+        yield b"".join(dumps(x) + b"\n" for x in documents)
+
+
+def export_tei(queryset, title, xml_id, chunk_size=TEI_CHUNK_SIZE):
+    """Yield a TEI document with an ``<entry>`` for every Beleg of ``queryset``.
+
+    ``queryset`` should prefetch everything rendered by
+    ``belege/partials/entry.j2``, see ``BelegManager.with_tei_related()``. The
+    entries carry the dboe_id of their Beleg as ``xml:id``.
+    """
+    head, tail = render_to_string(
+        "belege/tei_corpus.j2", {"title": title, "xml_id": xml_id, "entries": ENTRIES}
+    ).split(ENTRIES)
+    yield head.encode()
+    entry = get_template("belege/partials/entry.j2")
+    belege = queryset.order_by("dboe_id").iterator(chunk_size=chunk_size)
+    for batch in batched(belege, chunk_size):
+        yield "".join(
+            entry.render({"object": x, "corpus": True}) for x in batch
+        ).encode()
+    yield tail.encode()
+
+
+def streaming_response(request, content, content_type, filename):
+    """Stream ``content`` as attachment, gzip compressed if the client accepts it."""
+    gzipped = ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if gzipped:
+        content = compress_sequence(content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,81 @@
+from functools import cache
+from typing import NamedTuple
+
+import lxml.etree as ET
+from acdh_tei_pyutils.utils import extract_fulltext
+from acdh_xml_pyutils.xml import NSMAP
+from django.db import models
+from django_jsonform.models.fields import ArrayField
+
+
+class ExtractionRule(NamedTuple):
+    """How to fill a single model field from a TEI node."""
+
+    field_name: str
+    xpath: ET.XPath
+    many: bool
+    max_length: int | None
+
+
+@cache
+def get_extraction_plan(model_class) -> list[ExtractionRule]:
+    """Compile the ``xpath`` extras declared on the fields of ``model_class``.
+
+    The plan is built on first use and cached per model class.
+    """
+    plan = []
+    for field in model_class._meta.fields:
+        extra = getattr(field, "extra", {})
+        if "xpath" not in extra:
+            continue
+        if isinstance(field, ArrayField):
+            many = True
+        elif isinstance(field, (models.CharField, models.TextField)):
+            many = False
+        else:
+            continue
+        plan.append(
+            ExtractionRule(
+                field_name=field.name,
+                xpath=ET.XPath(extra["xpath"], namespaces=NSMAP),
+                many=many,
+                max_length=(
+                    field.max_length if isinstance(field, models.CharField) else None
+                ),
+            )
+        )
+    return plan
+
+
+def node_text(result) -> str:
+    """Fulltext of an element, or the value of an attribute/text xpath result."""
+    try:
+        return extract_fulltext(result)
+    except AttributeError:
+        return str(result)
+
+
+def extract_xml_fields(instance, node, strip=False, truncate=False):
+    """Populate the empty fields of ``instance`` declaring an ``xpath`` extra.
+
+    The compiled xpath expressions are evaluated relative to ``node``. Returns
+    True if a value had to be truncated to fit the ``max_length`` of a CharField.
+    """
+    truncated = False
+    for rule in get_extraction_plan(type(instance)):
+        if getattr(instance, rule.field_name):
+            continue
+        results = rule.xpath(node)
+        if rule.many:
+            setattr(instance, rule.field_name, [node_text(x).strip() for x in results])
+            continue
+        if not results:
+            continue
+        value = node_text(results[0])
+        if truncate and rule.max_length and len(value) > rule.max_length:
+            value = value[: rule.max_length]
+            truncated = True
+        if strip:
+            value = value.strip()
+        setattr(instance, rule.field_name, value)
+    return truncated
@@ -6,10 +6,71 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 
+class LazyXML:
+    """
+    Proxy for XML data loaded from the database; the raw string is only parsed
+    on first access of an attribute of the element (e.g. `.xpath()`), the parsed
+    element is memoized.
+    """
+
+    __slots__ = ("raw", "_element")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._element = None
+
+    @property
+    def element(self):
+        if self._element is None:
+            try:
+                self._element = ET.fromstring(self.raw)
+            except ET.ParseError:
+                raise ValidationError(_("Invalid XML data in database."))
+        return self._element
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.element, name)
+
+    def __iter__(self):
+        return iter(self.element)
+
+    def __len__(self):
+        return len(self.element)
+
+    def __getitem__(self, key):
+        return self.element[key]
+
+    def __getstate__(self):
+        return self.raw
+
+    def __setstate__(self, state):
+        self.raw = state
+        self._element = None
+
+    def __str__(self):
+        return self.raw
+
+    def __repr__(self):
+        return f"<LazyXML {self.raw[:50]!r}>"
+
+
+def parse_xml(value):
+    """Returns the given XML string, LazyXML or element as lxml element."""
+    if isinstance(value, LazyXML):
+        return value.element
+    if isinstance(value, ET._Element):
+        return value
+    return ET.fromstring(value.strip().encode("utf-8"))
+
+
 class XMLWidget(forms.widgets.Textarea):
     def format_value(self, value):
         if isinstance(value, ET._Element):
             return ET.tostring(value, encoding="unicode")
+        if isinstance(value, LazyXML):
+            return value.raw
         return value
 
 
@@ -31,7 +92,7 @@ class XMLField(models.Field):
         if value is None:
             return value
 
-        if isinstance(value, ET._Element):
+        if isinstance(value, (ET._Element, LazyXML)):
             return value
 
         try:
@@ -50,6 +111,9 @@ class XMLField(models.Field):
         if isinstance(value, ET._Element):
             return ET.tostring(value, encoding="unicode")
 
+        if isinstance(value, LazyXML):
+            return value.raw
+
         try:
             ET.fromstring(value)
         except ET.ParseError:
@@ -60,14 +124,12 @@ class XMLField(models.Field):
         """
         Convert a value as returned by the database to a Python object.
         This method is invoked when Django retrieves a value from the database.
+        Parsing is deferred until the value is actually used, see LazyXML.
         """
         if value is None:
             return value
 
-        try:
-            return ET.fromstring(value)
-        except ET.ParseError:
-            raise ValidationError(_("Invalid XML data in database."))
+        return LazyXML(value)
 
     def formfield(self, **kwargs):
         defaults = {
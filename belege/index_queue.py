@@ -0,0 +1,73 @@
+from django.db.models import F, Min
+from django.utils import timezone
+from opensearchpy.helpers import bulk
+
+from belege.models import Beleg, IndexQueueItem
+from belege.opensearch_client import OS_INDEX_NAME, client
+
+# failed attempts after which a Beleg is parked until it changes again
+MAX_ATTEMPTS = 5
+
+
+def queue_stats() -> dict:
+    """Return the number of queued Belege, the age of the oldest entry in seconds
+    and the number of parked Belege."""
+    pending = IndexQueueItem.objects.filter(attempts__lt=MAX_ATTEMPTS)
+    oldest = pending.aggregate(oldest=Min("queued_at"))["oldest"]
+    return {
+        "depth": pending.count(),
+        "lag": (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+        "parked": IndexQueueItem.objects.filter(attempts__gte=MAX_ATTEMPTS).count(),
+    }
+
+
+def flush_queue(batch_size=500, max_attempts=MAX_ATTEMPTS) -> int:
+    """Index the ``batch_size`` oldest queued Belege with a single bulk request.
+
+    Belege which no longer exist are deleted from the index. Entries are only
+    removed from the queue if they were not queued again in the meantime and
+    OpenSearch accepted the document. The attempts of the other entries are
+    counted, after ``max_attempts`` failures they are skipped (parked) until the
+    Beleg is queued again. Returns the number of removed entries.
+    """
+    pending = IndexQueueItem.objects.filter(attempts__lt=max_attempts)
+    items = list(pending.order_by("queued_at")[:batch_size])
+    if not items:
+        return 0
+    ids = {x.dboe_id for x in items}
+    actions = []
+    found = set()
+    belege = list(Beleg.objects.defer("orig_xml").filter(dboe_id__in=ids))
+    Beleg.objects.refresh_representations(belege)
+    failed = set()
+    for beleg in belege:
+        found.add(beleg.dboe_id)
+        try:
+            document = beleg.sanitize_representation()
+        except Exception as e:
+            print(f"failed to serialize {beleg} due to {e}")
+            failed.add(beleg.dboe_id)
+            continue
+        actions.append(
+            {
+                "_op_type": "index",
+                "_index": OS_INDEX_NAME,
+                "_id": document["id"],
+                "_source": document,
+            }
+        )
+    for dboe_id in ids - found:
+        actions.append({"_op_type": "delete", "_index": OS_INDEX_NAME, "_id": dboe_id})
+
+    _, errors = bulk(client, actions, refresh=False, raise_on_error=False)
+    for error in errors:
+        for op_type, result in error.items():
+            if not (op_type == "delete" and result.get("status") == 404):
+                print(f"failed to index {result.get('_id')}: {result.get('error')}")
+                failed.add(result.get("_id"))
+    IndexQueueItem.objects.filter(dboe_id__in=failed).update(attempts=F("attempts") + 1)
+    removed, _ = IndexQueueItem.objects.filter(
+        dboe_id__in=ids - failed,
+        queued_at__lte=max(x.queued_at for x in items),
+    ).delete()
+    return removed
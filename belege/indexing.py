@@ -0,0 +1,371 @@
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue
+from time import perf_counter, sleep
+
+from django.db import connections
+from django.utils import timezone
+from opensearchpy.helpers import streaming_bulk
+
+from belege.models import Beleg
+from belege.utils import transform_records
+
+# bulk item statuses worth retrying: rejected by a busy cluster, timeouts and
+# connection errors (the latter two are reported for every item of the request)
+RETRY_STATUS = (429, "TIMEOUT", "N/A")
+
+
+def serialize_batch(belege):
+    """Serialize a batch of Belege; runs in a worker process.
+
+    Missing representations are built and returned as minimal Beleg objects,
+    so they can be stored by the parent process. Belege which fail to serialize
+    are returned as a dict of their ids and the error messages.
+    """
+    start = perf_counter()
+    representations = []
+    failed = {}
+    built = []
+    for beleg in belege:
+        try:
+            if beleg.representation is None:
+                beleg.representation = beleg.build_representation()
+                built.append(
+                    Beleg(
+                        dboe_id=beleg.dboe_id,
+                        modified=beleg.modified,
+                        representation=beleg.representation,
+                    )
+                )
+            representations.append(beleg.representation)
+        except Exception as e:
+            failed[beleg.dboe_id] = f"failed to serialize {beleg} due to {e}"
+    documents = transform_records(representations)
+    return documents, failed, built, perf_counter() - start
+
+
+class AdaptiveBackoff:
+    """Delay shared by all bulk requests.
+
+    The delay doubles (starting at ``initial``, up to ``maximum`` seconds) every
+    time OpenSearch rejects documents or times out and halves after every
+    successful request until it drops back to zero.
+    """
+
+    def __init__(self, initial=0.5, maximum=60.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.delay = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if self.delay:
+            sleep(self.delay)
+
+    def throttled(self):
+        with self.lock:
+            self.delay = min(self.maximum, max(self.initial, self.delay * 2))
+        print(f"OpenSearch is busy, backing off for {self.delay:.1f}s")
+
+    def succeeded(self):
+        with self.lock:
+            self.delay = self.delay / 2 if self.delay > self.initial else 0.0
+
+
+class PipelineStats:
+    """Documents processed and time spent per stage of the indexing pipeline.
+
+    The rate of a stage is the number of documents per second it could sustain
+    if it never had to wait for the other stages, so the slowest stage is the
+    bottleneck: Postgres (db), Python (serialize) or OpenSearch (index).
+    """
+
+    def __init__(self, workers, in_flight):
+        self.parallel = {"db": 1, "serialize": workers, "index": in_flight}
+        self.docs = dict.fromkeys(self.parallel, 0)
+        self.seconds = dict.fromkeys(self.parallel, 0.0)
+        self.failed = []
+        self.start = perf_counter()
+        self.lock = threading.Lock()
+
+    def add(self, stage, docs, seconds):
+        with self.lock:
+            self.docs[stage] += docs
+            self.seconds[stage] += seconds
+
+    def rate(self, stage):
+        if not self.seconds[stage]:
+            return 0.0
+        return self.docs[stage] / self.seconds[stage] * self.parallel[stage]
+
+    def __str__(self):
+        stages = " | ".join(f"{x}: {self.rate(x):,.0f} docs/s" for x in self.parallel)
+        overall = self.docs["index"] / (perf_counter() - self.start)
+        return f"{stages} | overall: {overall:,.0f} docs/s"
+
+
+class Indexer:
+    """Sends serialized documents to OpenSearch, one bulk request at a time."""
+
+    def __init__(
+        self, client, index_name, backoff, chunk_size=500, max_retries=8, **kwargs
+    ):
+        self.client = client
+        self.index_name = index_name
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.kwargs = kwargs
+
+    def actions(self, documents):
+        for document in documents:
+            yield {
+                "_op_type": "index",
+                "_index": self.index_name,
+                "_id": document["id"],
+                "_source": document,
+            }
+
+    def index(self, documents):
+        """Index ``documents``, retrying rejected ones; returns the failed ids."""
+        pending = {x["id"]: x for x in documents}
+        failed = []
+        for attempt in range(self.max_retries + 1):
+            self.backoff.wait()
+            retry = {}
+            for ok, item in streaming_bulk(
+                self.client,
+                self.actions(pending.values()),
+                chunk_size=self.chunk_size,
+                raise_on_error=False,
+                raise_on_exception=False,
+                yield_ok=False,
+                **self.kwargs,
+            ):
+                _, info = item.popitem()
+                if info["status"] in RETRY_STATUS:
+                    retry[info["_id"]] = pending[info["_id"]]
+                else:
+                    print(f"failed to index {info['_id']}: {info.get('error')}")
+                    failed.append(info["_id"])
+            if not retry:
+                self.backoff.succeeded()
+                return failed
+            self.backoff.throttled()
+            pending = retry
+        print(f"giving up on {len(pending)} documents after {attempt + 1} attempts")
+        return failed + list(pending)
+
+    def run(self, queue, stats):
+        while (documents := queue.get()) is not None:
+            start = perf_counter()
+            try:
+                failed = self.index(documents)
+            except Exception as e:
+                print(f"failed to index {len(documents)} documents due to {e}")
+                failed = [x["id"] for x in documents]
+            stats.add("index", len(documents), perf_counter() - start)
+            with stats.lock:
+                stats.failed.extend(failed)
+
+
+def with_related_if_stale(batch):
+    """Reload the Belege without stored representation with their related objects."""
+    stale = [x.pk for x in batch if x.representation is None]
+    if not stale:
+        return batch
+    fresh = {x.pk: x for x in Beleg.objects.with_related().filter(pk__in=stale)}
+    return [fresh.get(x.pk, x) for x in batch]
+
+
+def read_batches(queryset, batch_size, stats):
+    batch = []
+    start = perf_counter()
+    for beleg in queryset.iterator(chunk_size=batch_size):
+        batch.append(beleg)
+        if len(batch) >= batch_size:
+            batch = with_related_if_stale(batch)
+            stats.add("db", len(batch), perf_counter() - start)
+            yield batch
+            batch = []
+            start = perf_counter()
+    if batch:
+        batch = with_related_if_stale(batch)
+        stats.add("db", len(batch), perf_counter() - start)
+        yield batch
+
+
+def write_dump(dump_dir, cur_nr, documents):
+    save_path = os.path.join(dump_dir, f"belege_{cur_nr:05}.json")
+    with open(save_path, "w", encoding="utf-8") as fp:
+        json.dump(documents, fp, ensure_ascii=False)
+    print(f"wrote {len(documents)} records to {save_path}")
+
+
+def index_belege(
+    queryset,
+    client,
+    index_name,
+    batch_size=1500,
+    workers=os.cpu_count(),
+    in_flight=2,
+    dump_dir=None,
+    **kwargs,
+) -> PipelineStats:
+    """Index the Belege of ``queryset``.
+
+    The queryset is read in batches of ``batch_size`` Belege, which are
+    serialized by ``workers`` processes and sent to OpenSearch by ``in_flight``
+    threads, each with at most one bulk request in flight. Missing stored
+    representations are built by the workers and saved by the reader. If ``dump_dir`` is
+    set, the serialized batches are written there as JSON files as well.
+    Further keyword arguments are passed on to ``Indexer``.
+    """
+    stats = PipelineStats(workers, in_flight)
+    indexer = Indexer(client, index_name, AdaptiveBackoff(), **kwargs)
+    queue = Queue(maxsize=in_flight)
+    cur_nr = 0
+
+    def handle(future):
+        nonlocal cur_nr
+        documents, failed, built, seconds = future.result()
+        stats.add("serialize", len(documents) + len(failed), seconds)
+        if built:
+            start = perf_counter()
+            Beleg.objects.store_representations(built)
+            stats.add("db", 0, perf_counter() - start)
+        for error in failed.values():
+            print(error)
+        with stats.lock:
+            stats.failed.extend(failed)
+        cur_nr += len(documents) + len(failed)
+        if dump_dir:
+            write_dump(dump_dir, cur_nr, documents)
+        queue.put(documents)
+        print(f"{cur_nr} Belege: {stats}")
+
+    # the workers never touch the database, but must not inherit open connections
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        # with fork all workers are started on the first submit, before the
+        # reader opens a connection and the indexer threads are started
+        executor.submit(os.getpid).result()
+        threads = [
+            threading.Thread(target=indexer.run, args=(queue, stats), daemon=True)
+            for _ in range(in_flight)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            pending = deque()
+            for batch in read_batches(queryset, batch_size, stats):
+                pending.append(executor.submit(serialize_batch, batch))
+                if len(pending) >= workers * 2:
+                    handle(pending.popleft())
+            while pending:
+                handle(pending.popleft())
+        finally:
+            for thread in threads:
+                queue.put(None)
+            for thread in threads:
+                thread.join()
+    print(f"done: {stats}")
+    return stats
+
+
+class IndexRebuild:
+    """Blue/green rebuild of the index behind the alias ``alias``.
+
+    The documents are loaded into a new, versioned index (e.g. ``dboe_v20261018``)
+    with refresh and replicas disabled. Once loaded, its settings are restored,
+    it is force-merged and the alias is moved to it in a single atomic request.
+    The previous index is kept for rollback.
+    """
+
+    # index settings which are set by OpenSearch and cannot be copied
+    INTERNAL_SETTINGS = {
+        "creation_date",
+        "provided_name",
+        "uuid",
+        "version",
+        "routing",
+        "resize",
+        "blocks",
+        "replication",
+    }
+
+    def __init__(self, client, alias, today=None):
+        self.client = client
+        self.alias = alias
+        self.previous = {}
+        if client.indices.exists(index=alias):
+            self.previous = client.indices.get(index=alias)
+        today = today or timezone.localdate()
+        self.index_name = f"{alias}_v{today:%Y%m%d}"
+        n = 1
+        while client.indices.exists(index=self.index_name):
+            n += 1
+            self.index_name = f"{alias}_v{today:%Y%m%d}_{n}"
+        # copy mappings and settings from the current index
+        self.mappings = {}
+        self.settings = {}
+        for definition in self.previous.values():
+            self.mappings = definition.get("mappings", {})
+            self.settings = {
+                key: value
+                for key, value in definition["settings"]["index"].items()
+                if key not in self.INTERNAL_SETTINGS
+            }
+        self.restore = {
+            "refresh_interval": self.settings.pop("refresh_interval", "1s"),
+            "number_of_replicas": self.settings.pop("number_of_replicas", "1"),
+        }
+
+    @property
+    def alias_is_index(self):
+        """True if ``alias`` is still the name of a concrete index."""
+        return self.alias in self.previous
+
+    def create(self):
+        self.client.indices.create(
+            index=self.index_name,
+            body={
+                "settings": {
+                    "index": {
+                        **self.settings,
+                        "refresh_interval": "-1",
+                        "number_of_replicas": 0,
+                    }
+                },
+                "mappings": self.mappings,
+            },
+        )
+
+    def finish(self):
+        self.client.indices.put_settings(
+            index=self.index_name, body={"index": self.restore}
+        )
+        self.client.indices.refresh(index=self.index_name)
+        self.client.indices.forcemerge(
+            index=self.index_name, max_num_segments=1, request_timeout=3600
+        )
+
+    def count(self):
+        return self.client.count(index=self.index_name)["count"]
+
+    def swap(self):
+        """Point the alias to the new index; a concrete index named like the alias is deleted."""
+        if self.alias_is_index:
+            actions = [{"remove_index": {"index": self.alias}}]
+        else:
+            actions = [
+                {"remove": {"index": x, "alias": self.alias}} for x in self.previous
+            ]
+        actions.append({"add": {"index": self.index_name, "alias": self.alias}})
+        self.client.indices.update_aliases(body={"actions": actions})
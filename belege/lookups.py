@@ -0,0 +1,20 @@
+from django.db.models import CharField, TextField
+from django.db.models.lookups import IContains
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class ILikeContains(IContains):
+    """Case insensitive substring match written as ``col ILIKE '%value%'``.
+
+    ``icontains`` compiles to ``UPPER(col::text) LIKE UPPER('%value%')``, which
+    can't use an index on the column; ``ILIKE`` uses the trigram (``gin_trgm_ops``)
+    indexes of the searchable fields.
+    """
+
+    lookup_name = "ilike_contains"
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs_sql} ILIKE {rhs_sql}", (*lhs_params, *rhs_params)
@@ -0,0 +1,178 @@
+import os
+from time import perf_counter
+
+import lxml.etree as ET
+from acdh_xml_pyutils.xml import NSMAP
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from annotations.models import Tag
+from annotations.serializers import TagSerializer
+from belege.extraction import extract_xml_fields, node_text
+from belege.models import Beleg, Citation, Lautung, LehnWort, Sense
+from belege.utils import transform_records
+from dboeannotation.renderers import ORJSONRenderer
+
+SAMPLE_FILE = os.path.join(settings.BASE_DIR, "sample_entries.xml")
+
+# child nodes of a tei:entry and the model their fields are extracted into
+CHILD_NODES = [
+    (Citation, "./tei:cit"),
+    (Lautung, "./tei:form[@type='lautung']"),
+    (LehnWort, "./tei:form[@type='lehnwort']"),
+    (Sense, "./tei:sense"),
+]
+
+
+def load_entries(path):
+    """Return the tei:entry elements of ``path``.
+
+    sample_entries.xml ships without the TEI namespace, it is added here so
+    the xpath expressions of the models match.
+    """
+    root = ET.parse(path).getroot()
+    for el in root.iter(tag=ET.Element):
+        if not ET.QName(el).namespace:
+            el.tag = f"{{{NSMAP['tei']}}}{el.tag}"
+    return root.xpath(".//tei:entry", namespaces=NSMAP)
+
+
+def extract_uncompiled(instance, node):
+    """The former extraction: every xpath string is compiled on each evaluation."""
+    for field in instance._meta.fields:
+        extra = getattr(field, "extra", {})
+        if "xpath" not in extra:
+            continue
+        results = node.xpath(extra["xpath"], namespaces=NSMAP)
+        if field.get_internal_type() == "ArrayField":
+            setattr(instance, field.name, [node_text(x).strip() for x in results])
+        elif results:
+            setattr(instance, field.name, node_text(results[0]).strip())
+
+
+def extract_compiled(instance, node):
+    extract_xml_fields(instance, node, strip=True)
+
+
+def run_extraction(entries, extract):
+    for entry in entries:
+        extract(Beleg(), entry)
+        for model_class, xpath_expr in CHILD_NODES:
+            for item in entry.xpath(xpath_expr, namespaces=NSMAP):
+                extract(model_class(), item)
+
+
+class Command(BaseCommand):
+    help = "micro-benchmarks of performance critical code paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "target", choices=["extraction", "representation", "transform", "render"]
+        )
+        parser.add_argument(
+            "--file",
+            default=SAMPLE_FILE,
+            help=f"TEI file to read the entries from (default: {SAMPLE_FILE})",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Number of passes over the entries (default: 50)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Number of Belege read from the database (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, f"benchmark_{options['target']}")(options)
+
+    def report(self, label, count, seconds, unit="entries"):
+        print(
+            f"{label:>12}: {count / seconds:,.0f} {unit}/s, "
+            f"{seconds / count * 1e6:,.1f} µs each ({seconds:.3f}s)"
+        )
+
+    def benchmark_extraction(self, options):
+        entries = load_entries(options["file"])
+        count = len(entries) * options["repeat"]
+        print(f"{len(entries)} entries x {options['repeat']} passes")
+        results = {}
+        for label, extract in [
+            ("uncompiled", extract_uncompiled),
+            ("compiled", extract_compiled),
+        ]:
+            start = perf_counter()
+            for _ in range(options["repeat"]):
+                run_extraction(entries, extract)
+            results[label] = perf_counter() - start
+            self.report(label, count, results[label])
+        print(f"speedup: {results['uncompiled'] / results['compiled']:.2f}x")
+
+    def benchmark_representation(self, options):
+        belege = list(Beleg.objects.with_related()[: options["limit"]])
+        if not belege:
+            raise CommandError("no Belege in the database")
+        count = len(belege) * options["repeat"]
+        print(f"{len(belege)} Belege x {options['repeat']} passes")
+        start = perf_counter()
+        for _ in range(options["repeat"]):
+            for beleg in belege:
+                beleg.build_representation()
+        self.report("single-pass", count, perf_counter() - start)
+
+    def benchmark_transform(self, options):
+        belege = list(Beleg.objects.with_related()[: options["limit"]])
+        if not belege:
+            raise CommandError("no Belege in the database")
+        raws = [
+            (
+                x.representation
+                if x.representation is not None
+                else x.build_representation()
+            )
+            for x in belege
+        ]
+        count = len(raws) * options["repeat"]
+        print(f"{len(raws)} representations x {options['repeat']} passes")
+        start = perf_counter()
+        for _ in range(options["repeat"]):
+            transform_records(raws)
+        self.report("type map", count, perf_counter() - start)
+
+    def benchmark_render(self, options):
+        request = Request(APIRequestFactory().get("/api/tags/", {"page_size": 10000}))
+        tags = []
+        for i in range(10000):
+            tag = Tag(id=i, name=f"Tag {i}", color="#aabbcc", meta={"note": f"Ä {i}"})
+            tag.belege_count = i % 100
+            tags.append(tag)
+        data = {
+            "count": len(tags),
+            "next": None,
+            "previous": None,
+            "results": TagSerializer(
+                tags, many=True, context={"request": request}
+            ).data,
+        }
+        count = options["repeat"]
+        print(f"page of {len(tags)} tags x {count} renders")
+        if JSONRenderer().render(data) != ORJSONRenderer().render(data):
+            raise CommandError("rendered pages differ")
+        results = {}
+        for label, renderer in [
+            ("json", JSONRenderer()),
+            ("orjson", ORJSONRenderer()),
+        ]:
+            start = perf_counter()
+            for _ in range(count):
+                renderer.render(data)
+            results[label] = perf_counter() - start
+            self.report(label, count, results[label], unit="pages")
+        print(f"speedup: {results['json'] / results['orjson']:.2f}x")
@@ -0,0 +1,55 @@
+import gzip
+import os
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from belege.export import EXPORT_CHUNK_SIZE, export_documents, filter_belege
+from belege.models import Beleg
+
+DEFAULT_OUTPUT = os.path.join(settings.MEDIA_ROOT, "belege.jsonl.gz")
+
+
+class Command(BaseCommand):
+    help = "exports the OpenSearch documents of all (or some) Belege as NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=DEFAULT_OUTPUT,
+            help=f"File to write, gzip compressed if it ends with .gz (default: {DEFAULT_OUTPUT})",
+        )
+        parser.add_argument(
+            "--collection", type=int, help="Only Belege of this collection (id)"
+        )
+        parser.add_argument("--tag", type=int, help="Only Belege with this tag (id)")
+        parser.add_argument(
+            "--sigle",
+            help="Only Belege of this Sigle, or of the Siglen within a Bundesland or region",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f"Number of Belege read per query (default: {EXPORT_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        queryset = filter_belege(
+            Beleg.objects.all(),
+            collection=options["collection"],
+            tag=options["tag"],
+            sigle=options["sigle"],
+        )
+        output = options["output"]
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        opener = gzip.open if output.endswith(".gz") else open
+        start = perf_counter()
+        count = 0
+        with opener(output, "wb") as fp:
+            for lines in export_documents(queryset, chunk_size=options["chunk_size"]):
+                fp.write(lines)
+                count += lines.count(b"\n")
+                print(f"{count} Belege exported")
+        print(f"wrote {count} Belege to {output} in {perf_counter() - start:.1f}s")
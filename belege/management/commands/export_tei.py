@@ -0,0 +1,80 @@
+import gzip
+import os
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from annotations.models import Collection
+from belege.export import TEI_CHUNK_SIZE, export_tei, filter_belege
+from belege.models import Beleg
+from siglen.models import Sigle
+
+DEFAULT_OUTPUT_DIR = os.path.join(settings.MEDIA_ROOT, "tei")
+
+
+class Command(BaseCommand):
+    help = "exports the Belege of collections or Siglen as TEI, one file per collection/Sigle"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--collection",
+            type=int,
+            nargs="+",
+            default=[],
+            help="IDs of the collections to export",
+        )
+        parser.add_argument(
+            "--sigle",
+            nargs="+",
+            default=[],
+            help="Siglen to export, a Bundesland or region includes the Siglen within",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=DEFAULT_OUTPUT_DIR,
+            help=f"Directory to write the files to (default: {DEFAULT_OUTPUT_DIR})",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            default=False,
+            help="Write gzip compressed files",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=TEI_CHUNK_SIZE,
+            help=f"Number of Belege read per query (default: {TEI_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if not options["collection"] and not options["sigle"]:
+            raise CommandError("pass at least one --collection or --sigle")
+        exports = []
+        for pk in options["collection"]:
+            try:
+                collection = Collection.objects.get(pk=pk)
+            except Collection.DoesNotExist:
+                raise CommandError(f"collection {pk} does not exist")
+            exports.append((f"collection_{pk}", collection.title, {"collection": pk}))
+        for pk in options["sigle"]:
+            try:
+                sigle = Sigle.objects.get(pk=pk)
+            except Sigle.DoesNotExist:
+                raise CommandError(f"Sigle {pk} does not exist")
+            exports.append((f"sigle_{pk}", sigle.name, {"sigle": pk}))
+
+        os.makedirs(options["output_dir"], exist_ok=True)
+        for xml_id, title, filters in exports:
+            file_name = f"{xml_id}.xml.gz" if options["gzip"] else f"{xml_id}.xml"
+            output = os.path.join(options["output_dir"], file_name)
+            opener = gzip.open if options["gzip"] else open
+            belege = filter_belege(Beleg.objects.with_tei_related(), **filters)
+            start = perf_counter()
+            with opener(output, "wb") as fp:
+                for content in export_tei(
+                    belege, title, xml_id, chunk_size=options["chunk_size"]
+                ):
+                    fp.write(content)
+            print(f"wrote {output} in {perf_counter() - start:.1f}s")
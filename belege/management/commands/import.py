@@ -1,37 +1,159 @@
 import glob
+import json
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
 
 import lxml.etree as ET
 from acdh_tei_pyutils.tei import TeiReader
 from acdh_tei_pyutils.utils import get_xmlid
-from django.core.management.base import BaseCommand
-from tqdm import tqdm
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
 
 from belege.models import Beleg
 
+CHECKPOINT_FILE = os.path.join(settings.MEDIA_ROOT, "import_checkpoint.json")
+
+
+def parse_file(path):
+    """Parse one TEI file into a list of (Beleg, children) tuples.
+
+    Runs in a worker process; the returned objects are unsaved and carry their
+    XML as strings so they can be pickled back to the parent process.
+    """
+    doc = TeiReader(path)
+    items = doc.any_xpath(".//tei:entry")
+    xenos = doc.any_xpath(".//tei:xenoData")
+    records = []
+    for i, entry in enumerate(items):
+        beleg = Beleg(
+            dboe_id=get_xmlid(entry),
+            orig_xml=ET.tostring(entry, encoding="unicode"),
+        )
+        beleg.import_issue = beleg.populate_from_xml(entry)
+        try:
+            beleg.xeno_data = xenos[i].text
+        except IndexError:
+            beleg.xeno_data = "NO MATCHING ENTRY FOUND: HANSI4EVER"
+            beleg.import_issue = True
+        records.append((beleg, beleg.build_children(entry)))
+    return records
+
+
+def bulk_upsert(model_class, objects, batch_size):
+    """Insert ``objects`` or update all their fields if the pk already exists."""
+    if not objects:
+        return
+    model_class.objects.bulk_create(
+        objects,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=[model_class._meta.pk.name],
+        update_fields=[
+            f.name for f in model_class._meta.concrete_fields if not f.primary_key
+        ],
+    )
+
 
 class Command(BaseCommand):
     help = "imports dboe xmls"
 
-    def handle(self, *args, **options):
-        files = sorted(
-            glob.glob("/home/csae8092/repos/dboe/legacy-data/orig-files/d178_*.xml")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source",
+            help="Glob pattern matching the TEI/XML files, e.g. '/data/orig-files/*.xml'",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of parser processes (default: number of CPUs)",
         )
-        for f, x in enumerate(files, start=1):
-            print(f"{f}/{len(files)} files")
-            fname = os.path.split(x)[-1]
-            doc = TeiReader(x)
-            items = doc.any_xpath(".//tei:entry")
-            xenos = doc.any_xpath(".//tei:xenoData")
-            print(f"processing {len(items)} entries from {fname}")
-            for i, entry in tqdm(enumerate(items), total=len(items)):
-                xml_id = get_xmlid(entry)
-                node_as_text = ET.tostring(entry, encoding="unicode")
-                beleg, _ = Beleg.objects.get_or_create(dboe_id=xml_id)
-                beleg.orig_xml = node_as_text
-                try:
-                    beleg.xeno_data = xenos[i].text
-                except IndexError:
-                    beleg.xeno_data = "NO MATCHING ENTRY FOUND: HANSI4EVER"
-                    beleg.import_issue = True
-                beleg.save(add_citations=True)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per INSERT statement (default: 1000)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=CHECKPOINT_FILE,
+            help=f"File tracking the already imported files (default: {CHECKPOINT_FILE})",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            default=False,
+            help="Ignore an existing checkpoint and import all files again",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        batch_size = options["batch_size"]
+        checkpoint = options["checkpoint"]
+        if workers <= 0 or batch_size <= 0:
+            raise CommandError("workers and batch-size must be positive integers")
+
+        files = sorted(glob.glob(options["source"]))
+        if not files:
+            raise CommandError(f"no files matching {options['source']}")
+        done = set()
+        if os.path.exists(checkpoint) and not options["restart"]:
+            with open(checkpoint, encoding="utf-8") as fp:
+                done = set(json.load(fp)["completed"])
+        todo = [x for x in files if x not in done]
+        print(f"{len(files)} files found, {len(files) - len(todo)} already imported")
+
+        # the workers never touch the database, but must not inherit open connections
+        connections.close_all()
+        total = 0
+        start = perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            pending = deque()
+            files_iter = iter(todo)
+            for x in files_iter:
+                pending.append((x, executor.submit(parse_file, x)))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                path, future = pending.popleft()
+                file_start = perf_counter()
+                records = future.result()
+                self.write_records(records, batch_size)
+                done.add(path)
+                self.write_checkpoint(checkpoint, done)
+                total += len(records)
+                print(
+                    f"{len(done)}/{len(files)} {os.path.split(path)[-1]}: "
+                    f"{len(records)} entries, "
+                    f"{len(records) / (perf_counter() - file_start):.1f} entries/s "
+                    f"(overall {total / (perf_counter() - start):.1f} entries/s)"
+                )
+                next_file = next(files_iter, None)
+                if next_file is not None:
+                    pending.append((next_file, executor.submit(parse_file, next_file)))
+        print(f"done: imported {total} entries in {perf_counter() - start:.1f}s")
+
+    def write_records(self, records, batch_size):
+        belege = []
+        children = {}
+        for beleg, beleg_children in records:
+            belege.append(beleg)
+            for model_class, objects in beleg_children.items():
+                children.setdefault(model_class, []).extend(objects)
+        with transaction.atomic():
+            bulk_upsert(Beleg, belege, batch_size)
+            for model_class, objects in children.items():
+                bulk_upsert(model_class, objects, batch_size)
+
+    def write_checkpoint(self, checkpoint, done):
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+        tmp_file = f"{checkpoint}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as fp:
+            json.dump({"completed": sorted(done)}, fp, ensure_ascii=False)
+        os.replace(tmp_file, checkpoint)
@@ -1,20 +1,32 @@
-import json
+import datetime
 import os
-from time import sleep
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from opensearchpy.exceptions import ConnectionTimeout
-from opensearchpy.helpers import bulk
-from tqdm import tqdm
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-from belege.models import Beleg
-from belege.opensearch_client import OS_INDEX_NAME, client
+from belege.indexing import IndexRebuild, index_belege
+from belege.models import Beleg, IndexState
+from belege.opensearch_client import OS_INDEX_NAME, client, host, os_available, port
 
 beleg_json_dir = os.path.join(settings.MEDIA_ROOT, "belege")
 os.makedirs(beleg_json_dir, exist_ok=True)
 
 
+def parse_timestamp(value):
+    """Parse an ISO 8601 date or datetime, naive values use the current timezone."""
+    timestamp = parse_datetime(value)
+    if timestamp is None:
+        date = parse_date(value)
+        if date is None:
+            raise CommandError(f"invalid timestamp: {value}")
+        timestamp = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return timestamp
+
+
 class Command(BaseCommand):
     help = "indexing Belege"
 
@@ -31,115 +43,129 @@ class Command(BaseCommand):
             default=False,
             help="Write batch files to disk (default: False)",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of serializer processes (default: number of CPUs)",
+        )
+        parser.add_argument(
+            "--in-flight",
+            type=int,
+            default=2,
+            help="Maximum number of concurrent bulk requests (default: 2)",
+        )
+        selection = parser.add_mutually_exclusive_group()
+        selection.add_argument(
+            "--since",
+            type=parse_timestamp,
+            help="Only index Belege changed after this ISO 8601 date or datetime",
+        )
+        selection.add_argument(
+            "--changed",
+            action="store_true",
+            default=False,
+            help="Only index Belege changed since the last successful run",
+        )
+        selection.add_argument(
+            "--rebuild",
+            action="store_true",
+            default=False,
+            help=(
+                "Load all Belege into a new versioned index and move the "
+                f"'{OS_INDEX_NAME}' alias to it once complete"
+            ),
+        )
+        parser.add_argument(
+            "--replace-index",
+            action="store_true",
+            default=False,
+            help=(
+                f"With --rebuild: delete an index named '{OS_INDEX_NAME}' to "
+                "replace it by the alias"
+            ),
+        )
 
     def handle(self, *args, **options):
-        cur_nr = 0
-        batch_size = options.get("batch_size") or 1500
-        dump_to_file = options.get("dump", False)
-        if batch_size <= 0:
-            raise ValueError("batch-size must be a positive integer")
-
-        total = Beleg.objects.count()
-        queryset = Beleg.objects.with_related().order_by("dboe_id")
-
-        batch = []
-        beleg_ids_in_batch = []
-
-        for x in tqdm(queryset.iterator(chunk_size=batch_size), total=total):
-            cur_nr += 1
-            beleg_ids_in_batch.append(x.dboe_id)
-            batch.append(x)
-
-            if len(batch) >= batch_size:
-                actions = []
-                for x in batch:
-                    try:
-                        serialized = x.sanitize_representation()
-                        actions.append(
-                            {
-                                "_op_type": "index",
-                                "_index": OS_INDEX_NAME,
-                                "_id": serialized["id"],
-                                "_source": serialized,
-                            }
-                        )
-                    except Exception as e:
-                        print(f"failed to serialize {x} due to {e}")
-                        continue
-
-                try:
-                    _, failed = bulk(client, actions)
-                    sleep(0.5)
-                except ConnectionTimeout:
-                    print(
-                        "OpenSearch connection timeout, waiting 5 seconds and try again"
-                    )
-                    sleep(5)
-                    try:
-                        _, failed = bulk(client, actions)
-                    except ConnectionTimeout:
-                        print(
-                            f"Failed to index batch: {cur_nr}, continue with next batch"
-                        )
-                        batch = []
-                        beleg_ids_in_batch = []
-                        continue
-                if failed:
-                    print(f"{failed=}")
-
-                if dump_to_file:
-                    serialized_batch = []
-                    for x in batch:
-                        try:
-                            serialized_batch.append(x.sanitize_representation())
-                        except Exception as e:
-                            print(f"failed to serialize {x} due to {e}")
-                            continue
-
-                    out_file = f"belege_{cur_nr:05}.json"
-                    save_path = os.path.join(beleg_json_dir, out_file)
-                    with open(save_path, "w", encoding="utf-8") as fp:
-                        json.dump(serialized_batch, fp, ensure_ascii=False)
-                    print(f"wrote {len(serialized_batch)} records to {save_path}")
-
-                batch = []
-                beleg_ids_in_batch = []
-
-        # Flush remaining records (if any)
-        if batch:
-            actions = []
-            for x in batch:
-                try:
-                    serialized = x.sanitize_representation()
-                    actions.append(
-                        {
-                            "_op_type": "index",
-                            "_index": OS_INDEX_NAME,
-                            "_id": serialized["id"],
-                            "_source": serialized,
-                        }
-                    )
-                except Exception as e:
-                    print(f"failed to serialize {x} due to {e}")
-                    continue
-
-            _, failed = bulk(client, actions)
-            if failed:
-                print(f"{failed=}")
-
-            if dump_to_file:
-                serialized_batch = []
-                for x in batch:
-                    try:
-                        serialized_batch.append(x.sanitize_representation())
-                    except Exception as e:
-                        print(f"failed to serialize {x} due to {e}")
-                        continue
-
-                out_file = f"belege_{cur_nr:05}.json"
-                save_path = os.path.join(beleg_json_dir, out_file)
-                with open(save_path, "w", encoding="utf-8") as fp:
-                    json.dump(serialized_batch, fp, ensure_ascii=False)
-                print(f"wrote final {len(serialized_batch)} records to {save_path}")
-
+        batch_size = options["batch_size"]
+        if batch_size <= 0 or options["workers"] <= 0 or options["in_flight"] <= 0:
+            raise CommandError(
+                "batch-size, workers and in-flight must be positive integers"
+            )
+
+        if not os_available():
+            raise CommandError(f"OpenSearch at {host}:{port} is not reachable")
+
+        # changes made while indexing are picked up by the next run
+        started = timezone.now()
+        if options["rebuild"]:
+            self.rebuild(started, options)
+            return
+        since = options["since"]
+        if options["changed"]:
+            state = IndexState.objects.filter(index_name=OS_INDEX_NAME).first()
+            if state is None:
+                print("no previous run found, indexing all Belege")
+            else:
+                since = state.indexed_until
+        queryset = Beleg.objects.defer("orig_xml").order_by("dboe_id")
+        if since is not None:
+            print(f"indexing Belege changed since {since.isoformat()}")
+            queryset = queryset.filter(
+                dboe_id__in=Beleg.objects.changed_since(since).values("dboe_id")
+            )
+        print(f"indexing {queryset.count()} Belege")
+
+        stats = index_belege(
+            queryset,
+            client,
+            OS_INDEX_NAME,
+            batch_size=batch_size,
+            workers=options["workers"],
+            in_flight=options["in_flight"],
+            dump_dir=beleg_json_dir if options["dump"] else None,
+        )
+        if stats.failed:
+            print(
+                f"{len(stats.failed)} Belege failed to index, "
+                "the high-water mark was not updated"
+            )
+        else:
+            IndexState.objects.update_or_create(
+                index_name=OS_INDEX_NAME, defaults={"indexed_until": started}
+            )
         print("done (all batches written)")
+
+    def rebuild(self, started, options):
+        rebuild = IndexRebuild(client, OS_INDEX_NAME)
+        if rebuild.alias_is_index and not options["replace_index"]:
+            raise CommandError(
+                f"'{OS_INDEX_NAME}' is an index, not an alias; "
+                "use --replace-index to delete it once the new index is complete"
+            )
+        print(f"loading all Belege into {rebuild.index_name}")
+        rebuild.create()
+        index_belege(
+            Beleg.objects.defer("orig_xml").order_by("dboe_id"),
+            client,
+            rebuild.index_name,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            in_flight=options["in_flight"],
+            dump_dir=beleg_json_dir if options["dump"] else None,
+        )
+        rebuild.finish()
+        expected = Beleg.objects.count()
+        indexed = rebuild.count()
+        if indexed != expected:
+            raise CommandError(
+                f"{rebuild.index_name} contains {indexed} documents instead of "
+                f"{expected}, the alias '{OS_INDEX_NAME}' was not changed"
+            )
+        rebuild.swap()
+        IndexState.objects.update_or_create(
+            index_name=OS_INDEX_NAME, defaults={"indexed_until": started}
+        )
+        print(f"'{OS_INDEX_NAME}' now points to {rebuild.index_name}")
+        if rebuild.previous and not rebuild.alias_is_index:
+            print(f"kept previous index {', '.join(rebuild.previous)} for rollback")
@@ -0,0 +1,70 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand, CommandError
+from opensearchpy.exceptions import ConnectionError, ConnectionTimeout
+
+from belege.index_queue import flush_queue, queue_stats
+from belege.opensearch_client import os_available
+
+
+class Command(BaseCommand):
+    help = "indexes queued Belege in OpenSearch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of Belege per bulk request (default: 500)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait before flushing newly queued changes (default: 5)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Flush the queue until it is empty and exit",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            default=False,
+            help="Print queue depth and lag and exit",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("batch-size must be a positive integer")
+        if options["stats"]:
+            self.print_stats()
+            return
+        while True:
+            if not os_available():
+                print(f"OpenSearch not reachable, retrying in {options['interval']}s")
+            else:
+                try:
+                    # stops when a batch removed nothing, its failed entries
+                    # are retried after the interval
+                    while flush_queue(batch_size=batch_size):
+                        self.print_stats()
+                except (ConnectionError, ConnectionTimeout) as e:
+                    print(
+                        f"OpenSearch not reachable ({e}), "
+                        f"retrying in {options['interval']}s"
+                    )
+            if options["once"]:
+                break
+            sleep(options["interval"])
+        print("done")
+
+    def print_stats(self):
+        stats = queue_stats()
+        print(
+            f"queue depth: {stats['depth']}, lag: {stats['lag']:.1f}s, "
+            f"parked: {stats['parked']}"
+        )
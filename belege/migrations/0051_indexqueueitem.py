@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("belege", "0050_alter_beleg_tag"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexQueueItem",
+            fields=[
+                (
+                    "dboe_id",
+                    models.CharField(
+                        help_text="ID of the Beleg to (re)index; deleted Belege are removed from the index",
+                        max_length=250,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Beleg ID",
+                    ),
+                ),
+                (
+                    "queued_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        help_text="Timestamp of the latest change, repeated changes are coalesced",
+                        verbose_name="Queued at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Index Queue Item",
+                "verbose_name_plural": "Index Queue",
+                "ordering": ["queued_at"],
+            },
+        ),
+    ]
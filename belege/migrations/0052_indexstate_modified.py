@@ -0,0 +1,118 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("belege", "0051_indexqueueitem"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexState",
+            fields=[
+                (
+                    "index_name",
+                    models.CharField(
+                        help_text="Name of the OpenSearch index",
+                        max_length=250,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Index name",
+                    ),
+                ),
+                (
+                    "indexed_until",
+                    models.DateTimeField(
+                        help_text="Changes up to this timestamp are contained in the index",
+                        verbose_name="Indexed until",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Index State",
+                "verbose_name_plural": "Index States",
+                "ordering": ["index_name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="anmerkunglautung",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="beleg",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="citation",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lautung",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lehnwort",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sense",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="zusatzlemma",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+    ]
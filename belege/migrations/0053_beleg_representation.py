@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("belege", "0052_indexstate_modified"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="beleg",
+            name="representation",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Stored result of build_representation(), reset whenever the Beleg or one of its related objects changes",
+                null=True,
+                verbose_name="Representation",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:27
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # the indexes are built without locking the tables for writes
+    atomic = False
+
+    dependencies = [
+        ("annotations", "0011_tag_modified"),
+        ("belege", "0053_beleg_representation"),
+        ("siglen", "0004_modified"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="beleg",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["hauptlemma"],
+                name="beleg_hauptlemma_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="beleg",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["nebenlemma"],
+                name="beleg_nebenlemma_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="citation",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["quote_text"],
+                name="citation_quote_text_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="citation",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["definition"],
+                name="citation_definition_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="lautung",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["pron"], name="lautung_pron_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="lehnwort",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["pron"], name="lehnwort_pron_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="sense",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["definition"],
+                name="sense_definition_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("belege", "0055_alter_lautung_dboe_id_alter_lehnwort_dboe_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="indexqueueitem",
+            name="attempts",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Number of failed attempts to index the Beleg since its latest change",
+                verbose_name="Attempts",
+            ),
+        ),
+    ]
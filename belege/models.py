@@ -1,14 +1,16 @@
 import xml.etree.ElementTree as ET
+from contextvars import ContextVar
 
-from acdh_tei_pyutils.tei import TeiReader
 from acdh_tei_pyutils.utils import extract_fulltext, get_xmlid
 from acdh_xml_pyutils.xml import NSMAP
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from django.utils import timezone
 from django_jsonform.models.fields import ArrayField
 
 from annotations.models import Collection, Tag
-from belege.fields import XMLField
-from belege.opensearch_client import OS_CONNECTION, OS_INDEX_NAME, client
+from belege.extraction import extract_xml_fields
+from belege.fields import XMLField, parse_xml
 from belege.utils import transform_record
 from siglen.models import BelegSigle
 
@@ -106,6 +108,14 @@ class ZusatzLemma(models.Model):
         choices=POS_CHOICES,
     ).set_extra(xpath="./tei:gramGrp/tei:gram", node_type="text")
 
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Zusatzlemma"
         verbose_name_plural = "Zusatzlemmata"
@@ -118,28 +128,9 @@ class ZusatzLemma(models.Model):
             return f"{self.dboe_id}"
 
     def save(self, *args, **kwargs):
+        self.modified = timezone.now()
         if self.orig_xml is not None:
-            try:
-                doc = TeiReader(self.orig_xml)
-            except AttributeError:
-                doc = TeiReader(ET.tostring(self.orig_xml).decode("utf-8"))
-            for field in self._meta.fields:
-                if (
-                    hasattr(field, "extra")
-                    and "xpath" in field.extra
-                    and isinstance(field, (models.CharField, models.TextField))
-                    and not getattr(self, field.name)
-                ):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)[0]
-                    except IndexError:
-                        continue
-                    try:
-                        value = extract_fulltext(nodes)
-                    except AttributeError:
-                        value = nodes
-                    setattr(self, field.name, value)
+            extract_xml_fields(self, parse_xml(self.orig_xml))
         super().save(*args, **kwargs)
 
 
@@ -252,52 +243,38 @@ class Citation(models.Model):
         help_text="whatever",
     ).set_extra(xpath="./tei:note[@type='diverse']", node_type="list")
 
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Kontext"
         verbose_name_plural = "Kontexte"
         ordering = ["beleg", "number"]
+        indexes = [
+            GinIndex(
+                fields=["quote_text"],
+                name="citation_quote_text_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["definition"],
+                name="citation_definition_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def save(self, add_zusatzlemma=False, *args, **kwargs):
+        self.modified = timezone.now()
         if self.orig_xml is not None:
-            try:
-                doc = TeiReader(self.orig_xml)
-            except AttributeError:
-                doc = TeiReader(ET.tostring(self.orig_xml).decode("utf-8"))
-            for field in self._meta.fields:
-                if (
-                    hasattr(field, "extra")
-                    and "xpath" in field.extra
-                    and isinstance(field, (models.CharField, models.TextField))
-                    and not getattr(self, field.name)
-                ):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)[0]
-                    except IndexError:
-                        continue
-                    try:
-                        value = extract_fulltext(nodes)
-                    except AttributeError:
-                        value = nodes
-                    setattr(self, field.name, value)
-                if isinstance(field, ArrayField) and not getattr(self, field.name):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)
-                    except IndexError:
-                        continue
-                    values = []
-                    for node in nodes:
-                        try:
-                            value = extract_fulltext(node)
-                        except AttributeError:
-                            value = node
-                        if isinstance(value, str):
-                            value = value.strip()
-                        values.append(value)
-                    setattr(self, field.name, values)
+            doc = parse_xml(self.orig_xml)
+            extract_xml_fields(self, doc)
         if self.orig_xml is not None and add_zusatzlemma:
-            items = doc.any_xpath("./tei:re")
+            items = doc.xpath("./tei:re", namespaces=NSMAP)
             for number, item in enumerate(items, start=1):
                 xml_id = get_xmlid(item)
                 orig_xml = ET.tostring(item, encoding="unicode")
@@ -392,37 +369,31 @@ class Lautung(models.Model):
         help_text="No help text provided",
     ).set_extra(xpath="./tei:gramGrp/tei:gram", node_type="text")
 
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Lautung"
         verbose_name_plural = "Lautungen"
         ordering = ["beleg", "number"]
+        indexes = [
+            GinIndex(
+                fields=["pron"], name="lautung_pron_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ]
 
     def __str__(self):
         return f"{self.pron} ({self.beleg})"
 
     def save(self, *args, **kwargs):
+        self.modified = timezone.now()
         if self.orig_xml is not None:
-            try:
-                doc = TeiReader(self.orig_xml)
-            except AttributeError:
-                doc = TeiReader(ET.tostring(self.orig_xml).decode("utf-8"))
-            for field in self._meta.fields:
-                if (
-                    hasattr(field, "extra")
-                    and "xpath" in field.extra
-                    and isinstance(field, (models.CharField, models.TextField))
-                    and not getattr(self, field.name)
-                ):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)[0]
-                    except IndexError:
-                        continue
-                    try:
-                        value = extract_fulltext(nodes)
-                    except AttributeError:
-                        value = nodes
-                    setattr(self, field.name, value)
+            extract_xml_fields(self, parse_xml(self.orig_xml))
         super().save(*args, **kwargs)
 
 
@@ -469,37 +440,31 @@ class LehnWort(models.Model):
         help_text="whatever",
     ).set_extra(xpath="./tei:gramGrp/tei:gram", node_type="text")
 
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Lehnwort"
         verbose_name_plural = "Lehnwörter"
         ordering = ["beleg", "number"]
+        indexes = [
+            GinIndex(
+                fields=["pron"], name="lehnwort_pron_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ]
 
     def __str__(self):
         return f"{self.pron} ({self.beleg})"
 
     def save(self, *args, **kwargs):
+        self.modified = timezone.now()
         if self.orig_xml is not None:
-            try:
-                doc = TeiReader(self.orig_xml)
-            except AttributeError:
-                doc = TeiReader(ET.tostring(self.orig_xml).decode("utf-8"))
-            for field in self._meta.fields:
-                if (
-                    hasattr(field, "extra")
-                    and "xpath" in field.extra
-                    and isinstance(field, (models.CharField, models.TextField))
-                    and not getattr(self, field.name)
-                ):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)[0]
-                    except IndexError:
-                        continue
-                    try:
-                        value = extract_fulltext(nodes)
-                    except AttributeError:
-                        value = nodes
-                    setattr(self, field.name, value)
+            extract_xml_fields(self, parse_xml(self.orig_xml))
         super().save(*args, **kwargs)
 
 
@@ -538,6 +503,14 @@ class AnmerkungLautung(models.Model):
         help_text="Iindicates a reference to the pronunciation(s) of the headword",
     )
 
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Anmerkung (Lautung)"
         verbose_name_plural = "Anmerkungen (Lautung)"
@@ -546,6 +519,10 @@ class AnmerkungLautung(models.Model):
     def __str__(self):
         return f"{self.dboe_id}"
 
+    def save(self, *args, **kwargs):
+        self.modified = timezone.now()
+        super().save(*args, **kwargs)
+
 
 class Sense(models.Model):
     """
@@ -595,53 +572,188 @@ class Sense(models.Model):
         help_text="Whatever",
     ).set_extra(xpath="./tei:note[@type='anmerkung' and @resp='B']", node_type="text")
 
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Bedeutung"
         verbose_name_plural = "Bedeutungen"
         ordering = ["beleg", "number"]
+        indexes = [
+            GinIndex(
+                fields=["definition"],
+                name="sense_definition_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.definition[:25]} ... ({self.beleg})"
 
     def save(self, *args, **kwargs):
+        self.modified = timezone.now()
         if self.orig_xml is not None:
-            try:
-                doc = TeiReader(self.orig_xml)
-            except AttributeError:
-                doc = TeiReader(ET.tostring(self.orig_xml).decode("utf-8"))
-            for field in self._meta.fields:
-                if (
-                    hasattr(field, "extra")
-                    and "xpath" in field.extra
-                    and isinstance(field, (models.CharField, models.TextField))
-                    and not getattr(self, field.name)
-                ):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)[0]
-                    except IndexError:
-                        continue
-                    try:
-                        value = extract_fulltext(nodes)
-                    except AttributeError:
-                        value = nodes
-                    setattr(self, field.name, value)
+            extract_xml_fields(self, parse_xml(self.orig_xml))
         super().save(*args, **kwargs)
 
 
+def is_empty(value) -> bool:
+    return value is None or value == "" or value == []
+
+
+# True while Beleg.save() syncs its children: the signal handlers of the child
+# models skip their per row work, the Beleg itself is queued and recounted once
+syncing_children = ContextVar("syncing_children", default=False)
+
+
+def deleted_with(origin, *model_classes) -> bool:
+    """True if the delete started with an instance or queryset of ``model_classes``.
+
+    ``origin`` is passed to the post_delete handlers; for the children of a
+    deleted Beleg it is the Beleg (a cascade), not the child itself.
+    """
+    model_class = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    return model_class in model_classes
+
+
+def sync_children(model_class, objects, parent_filter):
+    """Make the rows of ``model_class`` matching ``parent_filter`` equal ``objects``.
+
+    New rows are inserted and rows whose dboe_id is not part of ``objects``
+    anymore are deleted. Existing rows keep their values (they may have been
+    edited through the API), only their empty fields are filled from
+    ``objects``. Uses a constant number of queries: the signal handlers of the
+    deleted rows are skipped, the caller queues and resets the parent Beleg.
+    """
+    objects = {x.dboe_id: x for x in objects if x.dboe_id}
+    existing = model_class.objects.filter(dboe_id__in=objects).in_bulk()
+    model_class.objects.bulk_create(
+        [x for dboe_id, x in objects.items() if dboe_id not in existing]
+    )
+    fields = [f for f in model_class._meta.concrete_fields if not f.primary_key]
+    to_update = []
+    updated_fields = set()
+    for dboe_id, row in existing.items():
+        filled = [
+            f.attname
+            for f in fields
+            if is_empty(getattr(row, f.attname))
+            and not is_empty(getattr(objects[dboe_id], f.attname))
+        ]
+        for attname in filled:
+            setattr(row, attname, getattr(objects[dboe_id], attname))
+        if filled:
+            to_update.append(row)
+            updated_fields.update(filled)
+    if to_update:
+        # bulk_update() does not touch auto_now fields
+        modified = timezone.now()
+        for x in to_update:
+            x.modified = modified
+        model_class.objects.bulk_update(to_update, [*updated_fields, "modified"])
+    token = syncing_children.set(True)
+    try:
+        model_class.objects.filter(**parent_filter).exclude(
+            dboe_id__in=list(objects)
+        ).delete()
+    finally:
+        syncing_children.reset(token)
+
+
+class IndexQueueItem(models.Model):
+    """
+    A Beleg waiting to be (re)indexed in OpenSearch, see `manage.py index_queue`
+    """
+
+    dboe_id = models.CharField(
+        primary_key=True,
+        max_length=250,
+        verbose_name="Beleg ID",
+        help_text="ID of the Beleg to (re)index; deleted Belege are removed from the index",
+    )
+    queued_at = models.DateTimeField(
+        db_index=True,
+        verbose_name="Queued at",
+        help_text="Timestamp of the latest change, repeated changes are coalesced",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Attempts",
+        help_text="Number of failed attempts to index the Beleg since its latest change",
+    )
+
+    class Meta:
+        verbose_name = "Index Queue Item"
+        verbose_name_plural = "Index Queue"
+        ordering = ["queued_at"]
+
+    def __str__(self):
+        return f"{self.dboe_id} ({self.queued_at})"
+
+    @classmethod
+    def enqueue(cls, dboe_ids):
+        """Mark the given Belege as dirty; already queued ids get a new timestamp and
+        their failed attempts are reset."""
+        queued_at = timezone.now()
+        cls.objects.bulk_create(
+            [cls(dboe_id=x, queued_at=queued_at) for x in set(dboe_ids)],
+            update_conflicts=True,
+            unique_fields=["dboe_id"],
+            update_fields=["queued_at", "attempts"],
+        )
+
+
+class IndexState(models.Model):
+    """
+    High-water mark of the last successful run of `manage.py index` per index
+    """
+
+    index_name = models.CharField(
+        primary_key=True,
+        max_length=250,
+        verbose_name="Index name",
+        help_text="Name of the OpenSearch index",
+    )
+    indexed_until = models.DateTimeField(
+        verbose_name="Indexed until",
+        help_text="Changes up to this timestamp are contained in the index",
+    )
+
+    class Meta:
+        verbose_name = "Index State"
+        verbose_name_plural = "Index States"
+        ordering = ["index_name"]
+
+    def __str__(self):
+        return f"{self.index_name} ({self.indexed_until})"
+
+
 class BelegManager(models.Manager):
     def with_related(self):
-        """Return queryset with all related objects prefetched for optimal performance."""
+        """Return queryset with all related objects prefetched for optimal performance.
+
+        The (large) orig_xml columns are deferred; they are loaded on first access.
+        """
 
-        return self.prefetch_related(
+        return self.defer("orig_xml").prefetch_related(
             "facs",
             models.Prefetch(
-                "citations", queryset=Citation.objects.prefetch_related("zusatz_lemma")
+                "citations",
+                queryset=Citation.objects.defer("orig_xml").prefetch_related(
+                    models.Prefetch(
+                        "zusatz_lemma", queryset=ZusatzLemma.objects.defer("orig_xml")
+                    )
+                ),
             ),
-            "lautungen",
-            "lehnwoerter",
+            models.Prefetch("lautungen", queryset=Lautung.objects.defer("orig_xml")),
+            models.Prefetch("lehnwoerter", queryset=LehnWort.objects.defer("orig_xml")),
             "note_lautung",
-            "bedeutungen",
+            models.Prefetch("bedeutungen", queryset=Sense.objects.defer("orig_xml")),
             "tag",
             models.Prefetch(
                 "belegsigle_set",
@@ -651,6 +763,82 @@ class BelegManager(models.Manager):
             ),
         )
 
+    def with_tei_related(self):
+        """Like ``with_related()``, including the annotations rendered in the TEI templates."""
+        return self.with_related().prefetch_related("citations__annotation")
+
+    def refresh_representations(self, belege):
+        """Build and store the missing representations of ``belege`` in place."""
+        stale = {x.pk: x for x in belege if x.representation is None}
+        if not stale:
+            return
+        fresh = list(self.with_related().filter(pk__in=stale))
+        for beleg in fresh:
+            beleg.representation = beleg.build_representation()
+            stale[beleg.pk].representation = beleg.representation
+        self.store_representations(fresh)
+
+    def store_representations(self, belege):
+        """Save the representation of ``belege`` built by build_representation().
+
+        A representation is only written if the Beleg did not change since it
+        was loaded, otherwise it stays empty and is built again later.
+        """
+        with transaction.atomic():
+            modified = dict(
+                self.select_for_update()
+                .filter(pk__in=[x.pk for x in belege], representation__isnull=True)
+                .order_by()
+                .values_list("pk", "modified")
+            )
+            self.bulk_update(
+                [x for x in belege if modified.get(x.pk) == x.modified],
+                ["representation"],
+            )
+
+    def changed_since(self, timestamp):
+        """Return Belege whose own row or any related row changed after ``timestamp``.
+
+        Deleted child rows and added/removed tags update the Beleg's own timestamp.
+        """
+        beleg = models.OuterRef("pk")
+        return self.filter(
+            models.Q(modified__gt=timestamp)
+            | models.Exists(
+                Citation.objects.filter(beleg=beleg, modified__gt=timestamp)
+            )
+            | models.Exists(
+                ZusatzLemma.objects.filter(
+                    citation__beleg=beleg, modified__gt=timestamp
+                )
+            )
+            | models.Exists(Lautung.objects.filter(beleg=beleg, modified__gt=timestamp))
+            | models.Exists(
+                LehnWort.objects.filter(beleg=beleg, modified__gt=timestamp)
+            )
+            | models.Exists(
+                AnmerkungLautung.objects.filter(beleg=beleg, modified__gt=timestamp)
+            )
+            | models.Exists(Sense.objects.filter(beleg=beleg, modified__gt=timestamp))
+            | models.Exists(
+                BelegFacs.objects.filter(beleg=beleg, updated_at__gt=timestamp)
+            )
+            | models.Exists(
+                BelegSigle.objects.filter(beleg=beleg).filter(
+                    models.Q(modified__gt=timestamp)
+                    | models.Q(sigle__modified__gt=timestamp)
+                    | models.Q(sigle__bl__modified__gt=timestamp)
+                    | models.Q(sigle__gr__modified__gt=timestamp)
+                    | models.Q(sigle__kr__modified__gt=timestamp)
+                )
+            )
+            | models.Exists(
+                self.model.tag.through.objects.filter(
+                    beleg=beleg, tag__modified__gt=timestamp
+                )
+            )
+        )
+
 
 class Beleg(models.Model):
     """
@@ -814,10 +1002,40 @@ class Beleg(models.Model):
 
     objects = BelegManager()
 
+    representation = models.JSONField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Representation",
+        help_text=(
+            "Stored result of build_representation(), reset whenever the Beleg "
+            "or one of its related objects changes"
+        ),
+    )
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
+
     class Meta:
         verbose_name = "Beleg"
         verbose_name_plural = "Belege"
         ordering = ["dboe_id"]
+        indexes = [
+            GinIndex(
+                fields=["hauptlemma"],
+                name="beleg_hauptlemma_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["nebenlemma"],
+                name="beleg_nebenlemma_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         if self.hauptlemma:
@@ -834,158 +1052,125 @@ class Beleg(models.Model):
         *args,
         **kwargs,
     ):
+        self.modified = timezone.now()
+        self.representation = None
+        sync = []
         if self.orig_xml is not None:
-            self.import_issue = False
-            try:
-                doc = TeiReader(self.orig_xml)
-            except AttributeError:
-                doc = TeiReader(ET.tostring(self.orig_xml).decode("utf-8"))
-            for field in self._meta.fields:
-                if (
-                    hasattr(field, "extra")
-                    and "xpath" in field.extra
-                    and isinstance(field, (models.CharField, models.TextField))
-                    and not getattr(self, field.name)
-                ):
-                    if self.orig_xml is not None:
-                        xpath_expr = field.extra["xpath"]
-                        try:
-                            nodes = doc.any_xpath(xpath_expr)[0]
-                        except IndexError:
-                            continue
-                        try:
-                            value = extract_fulltext(nodes)
-                        except AttributeError:
-                            value = nodes
-                        if isinstance(field, models.CharField):
-                            if field.max_length and len(value) > field.max_length:
-                                value = value[: field.max_length]
-                                self.import_issue = True
-                        if isinstance(field, (models.CharField, models.TextField)):
-                            value = value.strip()
-                        setattr(self, field.name, value)
-                if isinstance(field, ArrayField) and not getattr(self, field.name):
-                    xpath_expr = field.extra["xpath"]
-                    try:
-                        nodes = doc.any_xpath(xpath_expr)
-                    except IndexError:
-                        continue
-                    values = []
-                    for node in nodes:
-                        try:
-                            value = extract_fulltext(node)
-                        except AttributeError:
-                            value = node
-                        if isinstance(value, str):
-                            value = value.strip()
-                        values.append(value)
-                    setattr(self, field.name, values)
-        if self.orig_xml is not None and add_anmkerung_laut:
-            items = doc.any_xpath(
-                "./tei:note[@type='anmerkung' and @resp and @corresp]"
+            doc = parse_xml(self.orig_xml)
+            self.import_issue = self.populate_from_xml(doc)
+            for flag, model_classes in [
+                (add_anmkerung_laut, [AnmerkungLautung]),
+                (add_citations, [Citation, ZusatzLemma]),
+                (add_lautungen, [Lautung]),
+                (add_lehnwort, [LehnWort]),
+                (add_sense, [Sense]),
+            ]:
+                if flag:
+                    sync.extend(model_classes)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if sync:
+                children = self.build_children(doc)
+                for model_class in sync:
+                    if model_class is ZusatzLemma:
+                        parent_filter = {"citation__beleg": self}
+                    else:
+                        parent_filter = {"beleg": self}
+                    sync_children(model_class, children[model_class], parent_filter)
+            IndexQueueItem.enqueue([self.dboe_id])
+
+    def populate_from_xml(self, node) -> bool:
+        """Fill the empty xpath-annotated fields from the given tei:entry node.
+
+        Returns True if a value had to be truncated, i.e. there is an import issue.
+        """
+        return extract_xml_fields(self, node, strip=True, truncate=True)
+
+    def build_children(self, node) -> dict:
+        """Build the unsaved child objects of this Beleg from its tei:entry node.
+
+        Returns a dict mapping each child model to a list of instances whose
+        xpath-annotated fields are already populated; ZusatzLemma objects are
+        linked to their (unsaved) Citation. Nothing is written to the database.
+        """
+        children = {
+            AnmerkungLautung: [],
+            Citation: [],
+            ZusatzLemma: [],
+            Lautung: [],
+            LehnWort: [],
+            Sense: [],
+        }
+        items = node.xpath(
+            "./tei:note[@type='anmerkung' and @resp and @corresp]", namespaces=NSMAP
+        )
+        for i, item in enumerate(items, start=1):
+            number = item.attrib.get("number", i)
+            children[AnmerkungLautung].append(
+                AnmerkungLautung(
+                    dboe_id=f"{self.dboe_id}_{number:0>2}",
+                    beleg=self,
+                    number=number,
+                    corresp_to=item.attrib["corresp"],
+                    resp=item.attrib["resp"],
+                    content=extract_fulltext(item),
+                    p_ref=[
+                        extract_fulltext(x)
+                        for x in item.xpath(".//tei:pRef", namespaces=NSMAP)
+                    ],
+                )
             )
-            for i, item in enumerate(items, start=1):
-                try:
-                    number = item.attrib["number"]
-                except KeyError:
-                    number = i
-                dboe_id = f"{self.dboe_id}_{number:0>2}"
-                item_object, _ = AnmerkungLautung.objects.get_or_create(
-                    dboe_id=dboe_id, beleg=self
+        for n, item in enumerate(node.xpath("./tei:cit", namespaces=NSMAP), start=1):
+            citation = Citation(
+                dboe_id=get_xmlid(item),
+                beleg=self,
+                number=item.attrib.get("n", n),
+                orig_xml=ET.tostring(item, encoding="unicode"),
+            )
+            extract_xml_fields(citation, item)
+            children[Citation].append(citation)
+            for number, re_node in enumerate(
+                item.xpath("./tei:re", namespaces=NSMAP), start=1
+            ):
+                zusatz_lemma = ZusatzLemma(
+                    dboe_id=get_xmlid(re_node),
+                    citation=citation,
+                    number=number,
+                    orig_xml=ET.tostring(re_node, encoding="unicode"),
                 )
-                item_object.number = number
-                item_object.corresp_to = item.attrib["corresp"]
-                item_object.resp = item.attrib["resp"]
-                item_object.content = extract_fulltext(item)
-                p_refs = []
-                for x in item.xpath(".//tei:pRef", namespaces=NSMAP):
-                    p_refs.append(extract_fulltext(x))
-                item_object.p_ref = p_refs
-                try:
-                    item_object.save()
-                except Exception as e:
-                    print(f"Error saving AnmerkungLautung {dboe_id}: {e}")
-        if self.orig_xml is not None and add_citations:
-            items = doc.any_xpath("./tei:cit")
-            for n, item in enumerate(items, start=1):
-                xml_id = get_xmlid(item)
-                try:
-                    number = item.attrib["n"]
-                except KeyError:
-                    number = n
-                orig_xml = ET.tostring(item, encoding="unicode")
-                try:
-                    item = Citation.objects.get(dboe_id=xml_id)
-                except Citation.DoesNotExist:
-                    item = Citation(
-                        dboe_id=xml_id, beleg=self, number=number, orig_xml=orig_xml
-                    )
-                try:
-                    item.save()
-                except Exception as e:
-                    print(f"Error saving citation {xml_id}: {e}")
-        if self.orig_xml is not None and add_lautungen:
-            items = doc.any_xpath("./tei:form[@type='lautung']")
-            for item in items:
-                xml_id = get_xmlid(item)
-                try:
-                    number = item.attrib["n"]
-                except KeyError:
-                    number = 1
-                orig_xml = ET.tostring(item, encoding="unicode")
-                try:
-                    item = Lautung.objects.get(dboe_id=xml_id)
-                except Lautung.DoesNotExist:
-                    item = Lautung(
-                        dboe_id=xml_id, beleg=self, number=number, orig_xml=orig_xml
-                    )
-                try:
-                    item.save()
-                except Exception as e:
-                    print(f"Error saving lautung {xml_id}: {e}")
-        if self.orig_xml is not None and add_lehnwort:
-            items = doc.any_xpath("./tei:form[@type='lehnwort']")
-            for item in items:
-                xml_id = get_xmlid(item)
-                try:
-                    number = item.attrib["n"]
-                except KeyError:
-                    number = 1
-                orig_xml = ET.tostring(item, encoding="unicode")
-                try:
-                    item = LehnWort.objects.get(dboe_id=xml_id)
-                except LehnWort.DoesNotExist:
-                    item = LehnWort(
-                        dboe_id=xml_id, beleg=self, number=number, orig_xml=orig_xml
-                    )
-                try:
-                    item.save()
-                except Exception as e:
-                    print(f"Error saving LehnWort {xml_id}: {e}")
-        if self.orig_xml is not None and add_sense:
-            items = doc.any_xpath("./tei:sense")
-            for i, item in enumerate(items, start=1):
-                xml_id = get_xmlid(item)
-                number = i
-                orig_xml = ET.tostring(item, encoding="unicode")
-                try:
-                    item = Sense.objects.get(dboe_id=xml_id)
-                except Sense.DoesNotExist:
-                    item = Sense(
-                        dboe_id=xml_id, beleg=self, number=number, orig_xml=orig_xml
-                    )
-                try:
-                    item.save()
-                except Exception as e:
-                    print(f"Error saving sense {xml_id}: {e}")
-        if OS_CONNECTION:
-            document = self.sanitize_representation()
-            id = document["id"]
-            client.index(index=OS_INDEX_NAME, body=document, id=id, refresh=True)
-        super().save(*args, **kwargs)
+                extract_xml_fields(zusatz_lemma, re_node)
+                children[ZusatzLemma].append(zusatz_lemma)
+        for model_class, xpath_expr in [
+            (Lautung, "./tei:form[@type='lautung']"),
+            (LehnWort, "./tei:form[@type='lehnwort']"),
+        ]:
+            for item in node.xpath(xpath_expr, namespaces=NSMAP):
+                child = model_class(
+                    dboe_id=get_xmlid(item),
+                    beleg=self,
+                    number=item.attrib.get("n", 1),
+                    orig_xml=ET.tostring(item, encoding="unicode"),
+                )
+                extract_xml_fields(child, item)
+                children[model_class].append(child)
+        for i, item in enumerate(node.xpath("./tei:sense", namespaces=NSMAP), start=1):
+            sense = Sense(
+                dboe_id=get_xmlid(item),
+                beleg=self,
+                number=i,
+                orig_xml=ET.tostring(item, encoding="unicode"),
+            )
+            extract_xml_fields(sense, item)
+            children[Sense].append(sense)
+        return children
 
     def build_representation(self, base: dict | None = None) -> dict:
-        """Return a dict identical to ``BelegSerializer.to_representation``."""
+        """Return a dict identical to ``BelegSerializer.to_representation``.
+
+        Every related object is visited once: citations are bucketed by their
+        ``corresp`` and notes and senses by the keys they contribute to. The keys
+        are inserted in the same order as before, so the JSON stays byte-identical.
+        """
 
         # Build the initial base if none was provided
         if base is None:
@@ -1004,28 +1189,25 @@ class Beleg(models.Model):
         # Collect simple references
         ret["tustep"] = self.xeno_data
         ret["facs"] = [f.file_name for f in self.facs.all()]
-        verweise = []
-        for x in [
-            "ref_type_dbo",
-            "ref_type_sni",
-            "xr_type_verweise_o",
-            "xr_type_verweise_b",
-        ]:
-            value = getattr(self, x, None)
-            if value:
-                verweise.append(value)
-
-        try:
-            cit_fragebogen_nr = " ".join(
-                c.fragebogen_nummer for c in self.citations.all() if c.fragebogen_nummer
+        verweise = [
+            value
+            for x in (
+                "ref_type_dbo",
+                "ref_type_sni",
+                "xr_type_verweise_o",
+                "xr_type_verweise_b",
             )
-        except TypeError:
-            cit_fragebogen_nr = ""
+            if (value := getattr(self, x, None))
+        ]
+
+        citations_list = list(self.citations.all())
+        cit_fragebogen_nr = " ".join(
+            c.fragebogen_nummer for c in citations_list if c.fragebogen_nummer
+        )
         if self.fragebogen_nummer:
-            fragebogen_nr = f"{self.fragebogen_nummer} "
+            ret["nr"] = f"{self.fragebogen_nummer} {cit_fragebogen_nr}"
         else:
-            fragebogen_nr = ""
-        ret["nr"] = f"{fragebogen_nr}{cit_fragebogen_nr}"
+            ret["nr"] = cit_fragebogen_nr
         ret["verweis"] = verweise
         ret["page"] = self.quelle_page
         ret["etym"] = self.etym
@@ -1039,22 +1221,13 @@ class Beleg(models.Model):
         orte = set()
         orig_orte = list()
         for x in self.belegsigle_set.all():
-            siglen.add(x.sigle.sigle)
-            orte.add(x.sigle.name)
-            for y in x.sigle.orig_names:
-                orig_orte.append(y)
-            try:
-                bundeslaender.add(f"{x.sigle.bl}")
-            except AttributeError:
-                pass
-            try:
-                gregion.add(f"{x.sigle.gr}")
-            except AttributeError:
-                pass
-            try:
-                kregion.add(f"{x.sigle.kr}")
-            except AttributeError:
-                pass
+            sigle = x.sigle
+            siglen.add(sigle.sigle)
+            orte.add(sigle.name)
+            orig_orte.extend(sigle.orig_names)
+            bundeslaender.add(f"{sigle.bl}")
+            gregion.add(f"{sigle.gr}")
+            kregion.add(f"{sigle.kr}")
         ret["siglen"] = list(siglen)
         ret["bundeslaender"] = list(bundeslaender)
         ret["gregion"] = list(gregion)
@@ -1063,126 +1236,123 @@ class Beleg(models.Model):
         ret["orig_orte"] = orig_orte
 
         # DV/LW*
-        ret["dv_lw_star"] = []
-        for x in self.note_diverse:
-            ret["dv_lw_star"].append(x)
+        ret["dv_lw_star"] = list(self.note_diverse)
 
         # Lautungen
         for x in self.lautungen.all():
-            gram_key = f"gram_lt{x.number}"
-            ret[gram_key] = [x.pron_gram]
-            teut_key = f"lt{x.number}_teuthonista"
-            ret[teut_key] = [x.pron]
+            ret[f"gram_lt{x.number}"] = [x.pron_gram]
+            ret[f"lt{x.number}_teuthonista"] = [x.pron]
 
         # Lehnwörter
         for x in self.lehnwoerter.all():
-            number = x.number
-            ret[f"lw{number}"] = x.pron
+            ret[f"lw{x.number}"] = x.pron
 
-        # Notes Lautung - use prefetched data
-        ret["anm_lt_star"] = [x.content for x in self.note_lautung.all()]
-
-        # Use prefetched citations
-        citations_list = list(self.citations.all())
-        try:
-            first_citation = next((c for c in citations_list if c.number == 1), None)
-            if first_citation:
-                ret["kl_kt1"] = first_citation.interpration
-        except AttributeError:
-            pass
-
-        ret["anm_kt_star"] = []
-        ret["bd_kt_star"] = []
-        ret["wbd_kt_star"] = []
-        ret["vrw_kt_star"] = []
-        ret["dv_kt_star"] = []
-
-        for x in citations_list:
-            if x.corresp and "this:LT" in x.corresp:
-                cur_lt = x.corresp.split(":")[-1]
-                key = f"kt_{cur_lt.lower()}"
-                value = x.quote_text
-                ret[key] = value
-            if x.definition_corresp is None and x.definition:
-                ret["bd_kt_star"].append(f"{x.definition} ›KT {x.number}")
-            elif x.definition:
-                ret["wbd_kt_star"].append(
-                    f"{x.definition} ›WBD/KT{x.number}/KT{x.number}"
+        # Notes Lautung
+        anm_lt_star = []
+        anm_lw_star = []
+        for x in self.note_lautung.all():
+            anm_lt_star.append(x.content)
+            if x.corresp_to and "this:LW1" in x.corresp_to.lower():
+                anm_lw_star.append(
+                    f"{x.resp}: {x.content} ›{x.corresp_to.replace('this:', '')}"
                 )
-            ret[f"kt{x.number}"] = [x.quote_text]
-            for y in x.zusatz_lemma.all():
-                ret[f"zl{y.number}_kt{x.number}"] = [
-                    f"{y.form_orth}||{y.pos}||{getattr(y, 'gram', None) or ''}"
+        ret["anm_lt_star"] = anm_lt_star
+
+        # Kontexte: the keys of every citation are collected first, they follow
+        # the *_kt_star lists
+        first_citation = None
+        anm_kt_star = []
+        bd_kt_star = []
+        wbd_kt_star = []
+        vrw_kt_star = []
+        dv_kt_star = []
+        kontexte = {}
+        by_corresp = {}
+        for x in citations_list:
+            nr = x.number
+            if first_citation is None and nr == 1:
+                first_citation = x
+            zusatz_lemmata = list(x.zusatz_lemma.all())
+            corresp = x.corresp
+            if corresp:
+                by_corresp.setdefault(corresp, []).append((x, zusatz_lemmata))
+                if "this:LT" in corresp:
+                    kontexte[f"kt_{corresp.split(':')[-1].lower()}"] = x.quote_text
+            if x.definition:
+                if x.definition_corresp is None:
+                    bd_kt_star.append(f"{x.definition} ›KT {nr}")
+                else:
+                    wbd_kt_star.append(f"{x.definition} ›WBD/KT{nr}/KT{nr}")
+            kontexte[f"kt{nr}"] = [x.quote_text]
+            for y in zusatz_lemmata:
+                kontexte[f"zl{y.number}_kt{nr}"] = [
+                    f"{y.form_orth}||{y.pos}||{y.gram or ''}"
                 ]
             for y in x.note_diverse:
-                ret["dv_kt_star"].append(f"{y} ›KT {x.number}")
+                dv_kt_star.append(f"{y} ›KT {nr}")
             if x.xr:
-                ret["vrw_kt_star"].append(f"O: {x.xr} ›KT{x.number}")
+                vrw_kt_star.append(f"O: {x.xr} ›KT{nr}")
             if x.note_anmerkung_o:
-                ret["anm_kt_star"].append(f"O: {x.note_anmerkung_o} ›KT{x.number}")
+                anm_kt_star.append(f"O: {x.note_anmerkung_o} ›KT{nr}")
             if x.note_anmerkung_b:
-                ret["anm_kt_star"].append(f"B: {x.note_anmerkung_b} ›KT{x.number}")
-
-        # Use prefetched bedeutungen - filter in Python
-        bedeutungen_list = list(self.bedeutungen.all())
-        ret["bd_lw_star"] = [
-            b.definition
-            for b in bedeutungen_list
-            if b.corresp_to and "LW" in b.corresp_to
-        ]
+                anm_kt_star.append(f"B: {x.note_anmerkung_b} ›KT{nr}")
+
+        if first_citation is not None:
+            ret["kl_kt1"] = first_citation.interpration
+        ret["anm_kt_star"] = anm_kt_star
+        ret["bd_kt_star"] = bd_kt_star
+        ret["wbd_kt_star"] = wbd_kt_star
+        ret["vrw_kt_star"] = vrw_kt_star
+        ret["dv_kt_star"] = dv_kt_star
+        ret.update(kontexte)
+
+        # Bedeutungen
+        bd_lw_star = []
+        bd_lt_star = []
+        for x in self.bedeutungen.all():
+            if not x.corresp_to:
+                continue
+            if "LW" in x.corresp_to:
+                bd_lw_star.append(x.definition)
+            if "LT" in x.corresp_to:
+                if x.note_anmerkung_o:
+                    bd_lt_star.append(
+                        f"{x.definition}ANMO: {x.note_anmerkung_o} ›LT{x.number}"
+                    )
+                else:
+                    bd_lt_star.append(f"{x.definition} ›LT{x.number}")
+        ret["bd_lw_star"] = bd_lw_star
 
-        for i in ["1", "2"]:
-            # Filter citations in Python instead of using QuerySet.filter()
+        for i in ("1", "2"):
+            kontext = by_corresp.get(f"this:LT{i}", ())
             ret[f"bd_kt_lt{i}"] = [
                 c.definition
-                for c in citations_list
-                if c.corresp == f"this:LT{i}"
-                and c.definition_corresp is None
-                and c.definition
+                for c, _ in kontext
+                if c.definition_corresp is None and c.definition
             ]
-            ret[f"kt_lt{i}"] = [
-                c.quote_text
-                for c in citations_list
-                if c.corresp == f"this:LT{i}" and c.quote_text
-            ]
-
-            # Get matching citations and their zusatz_lemma from prefetched data
-            kontext = [c for c in citations_list if c.corresp == f"this:LT{i}"]
+            ret[f"kt_lt{i}"] = [c.quote_text for c, _ in kontext if c.quote_text]
             ret[f"zl1_kt_lt{i}"] = ""
             ret[f"zl2_kt_lt{i}"] = ""
             n = 1
-            for citation in kontext:
-                for y in citation.zusatz_lemma.all():
+            for _, zusatz_lemmata in kontext:
+                for y in zusatz_lemmata:
                     ret[f"zl{n}_kt_lt{i}"] = (
-                        f"{y.form_orth}||{getattr(y, 'pos', None) or ''}||{getattr(y, 'gram', None) or ''}"
+                        f"{y.form_orth}||{y.pos or ''}||{y.gram or ''}"
                     )
                     n += 1
 
-        # Filter note_lautung in Python
-        ret["anm_lw_star"] = []
-        for x in self.note_lautung.all():
-            if x.corresp_to and "this:LW1" in x.corresp_to.lower():
-                ret["anm_lw_star"].append(
-                    f"{x.resp}: {x.content} ›{x.corresp_to.replace('this:', '')}"
-                )
-
-        # Filter bedeutungen in Python
-        ret["bd_lt_star"] = []
-        for x in bedeutungen_list:
-            if x.corresp_to and "LT" in x.corresp_to:
-                if x.note_anmerkung_o:
-                    ret["bd_lt_star"].append(
-                        f"{x.definition}ANMO: {x.note_anmerkung_o} ›LT{x.number}"
-                    )
-                else:
-                    ret["bd_lt_star"].append(f"{x.definition} ›LT{x.number}")
+        ret["anm_lw_star"] = anm_lw_star
+        ret["bd_lt_star"] = bd_lt_star
 
         for i, x in enumerate(self.zitierweise, start=1):
             ret[f"zw{i}"] = [x]
         return ret
 
     def sanitize_representation(self):
-        raw = self.build_representation()
+        if self.representation is not None:
+            raw = self.representation
+        else:
+            raw = self.build_representation()
         processed = transform_record(raw)
         return processed
 
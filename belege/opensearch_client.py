@@ -1,8 +1,19 @@
 import os
+import threading
+from time import monotonic
 
+from django.utils.functional import SimpleLazyObject
 from opensearchpy import OpenSearch
+from urllib3 import Timeout
 
 OS_INDEX_NAME = os.environ.get("OS_INDEX_NAME", "dboe")
+# seconds to wait for a connection to be established and for a response
+OS_CONNECT_TIMEOUT = float(os.environ.get("OS_CONNECT_TIMEOUT", "3"))
+OS_TIMEOUT = float(os.environ.get("OS_TIMEOUT", "60"))
+# connections kept open per host, should be >= the number of concurrent bulk requests
+OS_POOL_MAXSIZE = int(os.environ.get("OS_POOL_MAXSIZE", "10"))
+# seconds the result of a health check is reused before OpenSearch is probed again
+OS_HEALTH_TTL = float(os.environ.get("OS_HEALTH_TTL", "30"))
 
 host = os.environ.get("OS_HOST", "opensearch-api.acdh-ch-dev.oeaw.ac.at")
 port = os.environ.get("OS_PORT", "443")
@@ -10,20 +21,49 @@ auth = (
     os.environ.get("OS_USER", "drupal-writer"),
     os.environ.get("OS_PW", "Hansi4ever!"),
 )
-client = OpenSearch(
-    hosts=[{"host": host, "port": port}],
-    http_compress=True,
-    http_auth=auth,
-    use_ssl=True,
-    verify_certs=False,
-    ssl_assert_hostname=False,
-    ssl_show_warn=False,
-)
-try:
-    info = client.info()
-    print("Connection successful!")
-    print(f"OpenSearch version: {info['version']['number']}")
-    OS_CONNECTION = True
-except Exception as e:
-    print(f"Connection failed: {e}")
-    OS_CONNECTION = False
+
+_lock = threading.Lock()
+_client = None
+_health = {"available": False, "checked_at": None}
+
+
+def get_client() -> OpenSearch:
+    """Return the shared OpenSearch client, it is created on first use.
+
+    Creating the client does not open a connection; the pooled connections
+    are established by the first requests.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = OpenSearch(
+                hosts=[{"host": host, "port": port}],
+                http_compress=True,
+                http_auth=auth,
+                use_ssl=True,
+                verify_certs=False,
+                ssl_assert_hostname=False,
+                ssl_show_warn=False,
+                timeout=Timeout(connect=OS_CONNECT_TIMEOUT, read=OS_TIMEOUT),
+                pool_maxsize=OS_POOL_MAXSIZE,
+            )
+        return _client
+
+
+def os_available(ttl=OS_HEALTH_TTL) -> bool:
+    """Return whether OpenSearch answered the last health check.
+
+    The cluster is probed again once the result is older than ``ttl`` seconds,
+    so an outage or a recovery is noticed within ``ttl`` seconds.
+    """
+    checked_at = _health["checked_at"]
+    if checked_at is None or monotonic() - checked_at > ttl:
+        try:
+            available = get_client().ping(request_timeout=OS_CONNECT_TIMEOUT)
+        except Exception:
+            available = False
+        _health.update(available=available, checked_at=monotonic())
+    return _health["available"]
+
+
+client = SimpleLazyObject(get_client)
@@ -0,0 +1,77 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class PrimaryKeyCursorPagination(CursorPagination):
+    """Keyset pagination on the primary key (``dboe_id`` for Belege and their children)."""
+
+    ordering = "pk"
+
+
+class KeysetPaginationMixin:
+    """Opt-in keyset pagination for page number paginations.
+
+    Requests passing the ``cursor`` parameter (empty for the first page) are
+    paginated by ``PrimaryKeyCursorPagination``: the rows are ordered by primary
+    key and each page starts after the last row of the previous one, so deep
+    pages are as fast as the first one. ``next`` holds the link with the opaque
+    cursor of the following page; with ``count=false`` the ``COUNT(*)`` is skipped.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_pagination = None
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_pagination = PrimaryKeyCursorPagination()
+        self.cursor_pagination.page_size = self.page_size
+        self.cursor_pagination.page_size_query_param = self.page_size_query_param
+        self.cursor_pagination.max_page_size = self.max_page_size
+        self.cursor_count = None
+        if request.query_params.get(self.count_query_param, "").lower() != "false":
+            self.cursor_count = queryset.count()
+        return self.cursor_pagination.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination is None:
+            return super().get_paginated_response(data)
+        response = {
+            "next": self.cursor_pagination.get_next_link(),
+            "previous": self.cursor_pagination.get_previous_link(),
+            "results": data,
+        }
+        if self.cursor_count is not None:
+            response = {"count": self.cursor_count, **response}
+        return Response(response)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Keyset pagination cursor, pass an empty value for the first page.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to false to omit the total count with keyset pagination.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+
+class CustomPagination(KeysetPaginationMixin, PageNumberPagination):
+    page_size = 50
+    max_page_size = 50
+    page_size_query_param = "page_size"
+
+
+class LargeResultsSetPagination(KeysetPaginationMixin, PageNumberPagination):
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 10000
@@ -70,6 +70,12 @@ class BelegSerializer(PopulateLabelMixin, serializers.HyperlinkedModelSerializer
         return "48.033199664024224,13.996338548539455"
 
     def to_representation(self, instance):
+        if instance.representation is not None:
+            # stored result of build_representation(), only the url is missing
+            return {
+                "url": self.fields["url"].to_representation(instance),
+                **instance.representation,
+            }
         # Obtain the base representation from the parent class (core fields + url)
         base = super().to_representation(instance)
         # Delegate to model helper for enrichment
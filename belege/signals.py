@@ -0,0 +1,114 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from annotations.models import Tag
+from belege.models import (
+    AnmerkungLautung,
+    Beleg,
+    BelegFacs,
+    Citation,
+    Facsimile,
+    IndexQueueItem,
+    Lautung,
+    LehnWort,
+    Sense,
+    ZusatzLemma,
+    deleted_with,
+    syncing_children,
+)
+from siglen.models import BelegSigle, Sigle
+
+
+def touch_belege(dboe_ids):
+    """Bump ``Beleg.modified`` and reset the stored representation of the Belege.
+
+    Needed for changes to related objects, which the Beleg row does not reflect.
+    """
+    Beleg.objects.filter(dboe_id__in=dboe_ids).update(
+        modified=timezone.now(), representation=None
+    )
+
+
+@receiver(post_delete, sender=Beleg)
+def enqueue_deleted_beleg(sender, instance, **kwargs):
+    IndexQueueItem.enqueue([instance.dboe_id])
+
+
+@receiver(post_save, sender=AnmerkungLautung)
+@receiver(post_save, sender=BelegFacs)
+@receiver(post_save, sender=BelegSigle)
+@receiver(post_save, sender=Citation)
+@receiver(post_save, sender=Lautung)
+@receiver(post_save, sender=LehnWort)
+@receiver(post_save, sender=Sense)
+@receiver(post_delete, sender=AnmerkungLautung)
+@receiver(post_delete, sender=BelegFacs)
+@receiver(post_delete, sender=BelegSigle)
+@receiver(post_delete, sender=Citation)
+@receiver(post_delete, sender=Lautung)
+@receiver(post_delete, sender=LehnWort)
+@receiver(post_delete, sender=Sense)
+def enqueue_parent_beleg(sender, instance, raw=False, origin=None, **kwargs):
+    """Changes to related objects alter the indexed representation of their Beleg"""
+    if raw or syncing_children.get() or deleted_with(origin, Beleg):
+        return
+    IndexQueueItem.enqueue([instance.beleg_id])
+    touch_belege([instance.beleg_id])
+
+
+@receiver(post_save, sender=ZusatzLemma)
+@receiver(post_delete, sender=ZusatzLemma)
+def enqueue_zusatz_lemma_beleg(sender, instance, raw=False, origin=None, **kwargs):
+    # deleted with their citation, whose handler queues the Beleg
+    if raw or syncing_children.get() or deleted_with(origin, Beleg, Citation):
+        return
+    dboe_ids = Citation.objects.filter(dboe_id=instance.citation_id).values_list(
+        "beleg_id", flat=True
+    )
+    IndexQueueItem.enqueue(dboe_ids)
+    touch_belege(dboe_ids)
+
+
+@receiver(m2m_changed, sender=Beleg.tag.through)
+def enqueue_tagged_belege(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        dboe_ids = [instance.dboe_id]
+    elif pk_set:
+        dboe_ids = pk_set
+    elif action == "pre_clear":
+        dboe_ids = list(instance.belege.values_list("dboe_id", flat=True))
+    else:
+        return
+    IndexQueueItem.enqueue(dboe_ids)
+    touch_belege(dboe_ids)
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_belege_of_deleted_tag(sender, instance, **kwargs):
+    """Deleting a Tag removes its links to the Belege without m2m_changed"""
+    dboe_ids = list(instance.belege.values_list("dboe_id", flat=True))
+    IndexQueueItem.enqueue(dboe_ids)
+    touch_belege(dboe_ids)
+
+
+@receiver(post_save, sender=Facsimile)
+@receiver(post_save, sender=Sigle)
+@receiver(post_save, sender=Tag)
+def reset_related_representations(sender, instance, created, raw=False, **kwargs):
+    """Names of facsimiles, siglen and tags are part of the stored representations"""
+    if raw or created:
+        return
+    if sender is Sigle:
+        belege = Beleg.objects.filter(
+            Q(sigle=instance)
+            | Q(sigle__bl=instance)
+            | Q(sigle__gr=instance)
+            | Q(sigle__kr=instance)
+        )
+    else:
+        belege = instance.belege.all()
+    touch_belege(belege.values_list("dboe_id", flat=True).distinct())
@@ -1,9 +1,57 @@
+import datetime
+import decimal
+import gzip
+import importlib
+import io
+import json
+import re
+import tempfile
+from unittest import mock
+
+import lxml.etree as ET
+from acdh_xml_pyutils.xml import NSMAP
+from django.apps import apps as django_apps
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import get_resolver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 
+from annotations.models import Collection, Edit_of_article, Lemma, Tag
 from belege import api_views as belege_api_views
+from belege import index_queue, indexing
+from belege.api_utils import get_filterset_for_model
+from belege.extraction import extract_xml_fields, get_extraction_plan
+from belege.fields import LazyXML, parse_xml
+from belege.management.commands import index as index_command
+from belege.models import (
+    Beleg,
+    Citation,
+    IndexQueueItem,
+    IndexState,
+    Lautung,
+    LehnWort,
+    Sense,
+    ZusatzLemma,
+)
+from belege.tests_legacy import (
+    build_representation_legacy,
+    extract_xml_fields_legacy,
+    transform_record_legacy,
+)
+from belege.utils import transform_records
+from dboeannotation.api_cache import get_cache, get_version
+from dboeannotation.parsers import ORJSONParser
+from dboeannotation.renderers import ORJSONRenderer
 from dboeannotation.urls import router
+from siglen.models import BelegSigle, Sigle
+from stats.models import BelegStats, TagStats
 
 client = Client()
 
@@ -16,6 +64,8 @@ class BelegTestCase(TestCase):
     def setUp(self):
         """Create test user"""
         User.objects.create_user(**USER)
+        # cached responses would outlive the rolled back data of other tests
+        get_cache().clear()
 
     def get_belege_endpoints(self):
         """Extract belege API endpoints from the router"""
@@ -123,3 +173,807 @@ class BelegTestCase(TestCase):
                     200,
                     f"Expected 200 for {endpoint}, got {response.status_code}",
                 )
+
+    def test_005_beleg_save_syncs_children(self):
+        """Saving with add_* flags syncs child rows with a constant number of queries"""
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        sync_flags = {
+            "add_citations": True,
+            "add_lautungen": True,
+            "add_sense": True,
+            "add_anmkerung_laut": True,
+            "add_lehnwort": True,
+        }
+        beleg.save(**sync_flags)
+        self.assertEqual(beleg.citations.count(), 6)
+        self.assertEqual(beleg.lautungen.count(), 4)
+        self.assertEqual(beleg.note_lautung.count(), 3)
+
+        # per child type: fetch the existing rows, collect rows to delete;
+        # unchanged rows are not updated
+        with self.assertNumQueries(13):
+            beleg.save(**sync_flags)
+
+        # edits of existing rows (e.g. through the API) are kept, empty fields filled
+        citation = beleg.citations.order_by("pk").first()
+        edited = "edited definition"
+        Citation.objects.filter(pk=citation.pk).update(definition=edited, quote_text="")
+        beleg.save(add_citations=True)
+        citation.refresh_from_db()
+        self.assertEqual(citation.definition, edited)
+        self.assertNotEqual(citation.quote_text, "")
+
+        doc = parse_xml(beleg.orig_xml)
+        doc.remove(doc.xpath("./tei:cit", namespaces=NSMAP)[-1])
+        beleg.orig_xml = ET.tostring(doc, encoding="unicode")
+        with CaptureQueriesContext(connection) as one:
+            beleg.save(add_citations=True)
+        self.assertEqual(beleg.citations.count(), 5)
+        self.assertFalse(Citation.objects.filter(dboe_id="tu-27952.4").exists())
+
+        # vanished children are deleted without running the handlers per row
+        for cit in doc.xpath("./tei:cit", namespaces=NSMAP)[-3:]:
+            doc.remove(cit)
+        beleg.orig_xml = ET.tostring(doc, encoding="unicode")
+        with CaptureQueriesContext(connection) as three:
+            beleg.save(add_citations=True)
+        self.assertEqual(beleg.citations.count(), 2)
+        self.assertEqual(len(one), len(three))
+
+        # the children of a deleted Beleg do not queue or touch it again
+        IndexQueueItem.objects.all().delete()
+        dboe_id = beleg.dboe_id
+        with CaptureQueriesContext(connection) as queries:
+            beleg.delete()
+        statements = [x["sql"] for x in queries.captured_queries]
+        self.assertFalse(
+            [x for x in statements if x.startswith('UPDATE "belege_beleg"')]
+        )
+        self.assertEqual(
+            len([x for x in statements if '"belege_indexqueueitem"' in x]), 1
+        )
+        self.assertEqual(
+            list(IndexQueueItem.objects.values_list("pk", flat=True)), [dboe_id]
+        )
+
+    def test_006_beleg_changed_since(self):
+        """Changes to a Beleg, its children and its tags are found by changed_since"""
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        beleg.save(add_citations=True)
+        since = timezone.now()
+        self.assertFalse(Beleg.objects.changed_since(since).exists())
+
+        beleg.citations.first().save()
+        changed = Beleg.objects.changed_since(since)
+        self.assertEqual(list(changed.values_list("dboe_id", flat=True)), [beleg.pk])
+
+        since = timezone.now()
+        other = Beleg.objects.exclude(pk=beleg.pk).first()
+        other.tag.add(Tag.objects.create(name="changed"))
+        changed = Beleg.objects.changed_since(since)
+        self.assertEqual(list(changed.values_list("dboe_id", flat=True)), [other.pk])
+
+    def test_007_index_rebuild_swaps_alias(self):
+        """index --rebuild loads a new index and moves the alias only if complete"""
+        alias = index_command.OS_INDEX_NAME
+        stub = mock.MagicMock()
+        stub.indices.exists.side_effect = lambda index: index == alias
+        stub.indices.get.return_value = {
+            f"{alias}_v20250101": {
+                "aliases": {alias: {}},
+                "mappings": {"properties": {"id": {"type": "keyword"}}},
+                "settings": {
+                    "index": {
+                        "number_of_shards": "1",
+                        "number_of_replicas": "2",
+                        "refresh_interval": "5s",
+                        "uuid": "abc",
+                        "creation_date": "1735689600000",
+                    }
+                },
+            }
+        }
+        stub.count.return_value = {"count": Beleg.objects.count() - 1}
+        with (
+            mock.patch.object(index_command, "client", stub),
+            mock.patch.object(index_command, "os_available", return_value=True),
+            mock.patch.object(index_command, "index_belege") as index_belege,
+        ):
+            with self.assertRaises(CommandError):
+                call_command("index", "--rebuild")
+            stub.indices.update_aliases.assert_not_called()
+
+            stub.count.return_value = {"count": Beleg.objects.count()}
+            call_command("index", "--rebuild")
+
+        new_index = index_belege.call_args.args[2]
+        self.assertRegex(new_index, rf"^{alias}_v\d{{8}}$")
+        body = stub.indices.create.call_args.kwargs["body"]
+        self.assertEqual(
+            body["settings"]["index"],
+            {
+                "number_of_shards": "1",
+                "refresh_interval": "-1",
+                "number_of_replicas": 0,
+            },
+        )
+        stub.indices.put_settings.assert_called_with(
+            index=new_index,
+            body={"index": {"refresh_interval": "5s", "number_of_replicas": "2"}},
+        )
+        stub.indices.update_aliases.assert_called_once_with(
+            body={
+                "actions": [
+                    {"remove": {"index": f"{alias}_v20250101", "alias": alias}},
+                    {"add": {"index": new_index, "alias": alias}},
+                ]
+            }
+        )
+
+    def test_008_beleg_representation_is_stored(self):
+        """List views store the representation, changes to related objects reset it"""
+        endpoint = "/api/belege-elastic-search/"
+        first = client.get(endpoint).json()
+        self.assertFalse(Beleg.objects.filter(representation__isnull=True).exists())
+        with self.assertNumQueries(2):
+            second = client.get(endpoint).json()
+        self.assertEqual(first, second)
+
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        beleg.tag.add(Tag.objects.create(name="stored"))
+        beleg.refresh_from_db()
+        self.assertIsNone(beleg.representation)
+        response = client.get(f"{endpoint}{beleg.pk}/").json()
+        self.assertIn("stored", response["tags"])
+
+    def test_009_build_representation_matches_legacy(self):
+        """The single-pass representation is byte-identical to the former one"""
+        for beleg in Beleg.objects.all():
+            beleg.save(
+                add_citations=True,
+                add_lautungen=True,
+                add_sense=True,
+                add_anmkerung_laut=True,
+                add_lehnwort=True,
+            )
+            for sigle in Sigle.objects.all()[:3]:
+                BelegSigle.objects.create(beleg=beleg, sigle=sigle)
+        self.assertTrue(Citation.objects.exists())
+        for beleg in Beleg.objects.with_related():
+            self.assertEqual(
+                json.dumps(beleg.build_representation()),
+                json.dumps(build_representation_legacy(beleg)),
+            )
+
+    def test_010_transform_records(self):
+        """Representations are normalized without queries, as before"""
+        for beleg in Beleg.objects.all():
+            beleg.save(add_citations=True, add_lautungen=True)
+        raws = [x.build_representation() for x in Beleg.objects.with_related()]
+        raws[0]["unknown"] = [1, None, "x"]
+        # the fixture has no Kontext of the Lautungen
+        raws.append(
+            {
+                "id": "x",
+                "kt_lt1": ["a", "b"],
+                "kt_lt2": ["c"],
+                "zl1_kt_lt1": "d",
+                "bd_kt_lt1": ["e", None],
+            }
+        )
+        with self.assertNumQueries(0):
+            documents = transform_records(raws)
+        self.assertEqual(documents, [transform_record_legacy(x) for x in raws])
+        self.assertEqual(documents[0]["unknown"], ["1", "x"])
+        self.assertEqual(documents[-1]["kt_lt1"], ["a", "b"])
+        self.assertEqual(documents[-1]["kt_lt2"], ["c"])
+
+    def test_011_orjson_renderer(self):
+        """The orjson renderer produces the same JSON as DRF's JSONRenderer"""
+        data = {
+            "decimal": decimal.Decimal("1.5"),
+            "datetime": datetime.datetime(2025, 6, 1, 12, 30, tzinfo=datetime.UTC),
+            "date": datetime.date(2025, 6, 1),
+            "lazy": gettext_lazy("Tag"),
+            "tags": {1: {"id": 1, "name": "Ä\u2028"}}.values(),
+        }
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(rendered))["datetime"],
+            "2025-06-01T12:30:00Z",
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b"{"))
+        response = client.get("/api/collections/", {"page_size": 10000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 12)
+
+    def test_012_keyset_pagination(self):
+        """With cursor=, Belege are paginated by dboe_id following an opaque cursor"""
+        endpoint = "/api/belege-elastic-search/"
+        first = client.get(endpoint, {"cursor": "", "page_size": 2}).json()
+        self.assertEqual(first["count"], 3)
+        self.assertEqual(len(first["results"]), 2)
+        second = client.get(f"{first['next']}&count=false").json()
+        self.assertNotIn("count", second)
+        self.assertIsNone(second["next"])
+        ids = [x["id"] for x in first["results"] + second["results"]]
+        self.assertEqual(ids, list(Beleg.objects.values_list("dboe_id", flat=True)))
+        self.assertIn("count", client.get(endpoint).json())
+
+    def test_013_bulk_fetch_streams_ndjson(self):
+        """Belege are streamed in request order, missing ids are listed at the end"""
+        ids = ["f243_qdb-d1e29146", "unknown", "d198_qdbn-d16e17226"]
+        response = client.post(
+            "/api/belege-elastic-search/bulk/",
+            {"ids": ids},
+            content_type="application/json",
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [
+            json.loads(x) for x in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([x["id"] for x in lines[:-1]], [ids[0], ids[2]])
+        self.assertEqual(lines[-1], {"missing": ["unknown"]})
+        response = client.post(
+            "/api/belege-elastic-search/bulk/",
+            {"ids": ["x"] * (belege_api_views.BULK_MAX_IDS + 1)},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_014_export_ndjson(self):
+        """All Belege or those of a tag are exported as NDJSON, gzipped on request"""
+        response = client.get("/api/belege-elastic-search/export/")
+        self.assertNotIn("Content-Encoding", response)
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(x)["id"] for x in lines],
+            list(Beleg.objects.values_list("dboe_id", flat=True)),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            output = f"{tmp}/belege.jsonl.gz"
+            call_command("export", output=output, stdout=io.StringIO())
+            with gzip.open(output) as fp:
+                exported = [json.loads(x) for x in fp.read().splitlines()]
+        self.assertEqual(exported, [json.loads(x) for x in lines])
+        tag = Tag.objects.create(name="export")
+        Beleg.objects.get(dboe_id="e224_qdb-d1e65954").tag.add(tag)
+        response = client.get(
+            "/api/belege-elastic-search/export/",
+            {"tag": tag.pk},
+            HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(json.loads(content)["tags"], ["export"])
+
+    def test_015_export_tei(self):
+        """The Belege of a collection are exported as one TEI document"""
+        collection = Collection.objects.first()
+        for beleg in Beleg.objects.all():
+            beleg.save(add_citations=True, add_lautungen=True)
+            beleg.collection.add(collection)
+        with self.assertNumQueries(12):
+            response = client.get(f"/belege/tei/collection/{collection.pk}/")
+            content = b"".join(response.streaming_content)
+        doc = ET.fromstring(content)
+        entries = doc.xpath(".//tei:body/tei:entry", namespaces=NSMAP)
+        self.assertEqual(len(entries), 3)
+        xml_id = "{http://www.w3.org/XML/1998/namespace}id"
+        self.assertEqual(
+            [x.get(xml_id) for x in entries],
+            sorted(collection.beleg.values_list("dboe_id", flat=True)),
+        )
+        # the detail view has the id on <TEI>
+        del entries[1].attrib[xml_id]
+        detail = ET.fromstring(client.get("/belege/e224_qdb-d1e65954/").content)
+        self.assertEqual(
+            ET.tostring(entries[1], with_tail=False),
+            ET.tostring(detail.find(".//tei:entry", namespaces=NSMAP), with_tail=False),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command("export_tei", collection=[collection.pk], output_dir=tmp)
+            with open(f"{tmp}/collection_{collection.pk}.xml", "rb") as fp:
+                self.assertEqual(fp.read(), content)
+
+    def test_016_stats_tables(self):
+        """The stats views read counts refreshed when Belege and tags change"""
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        with self.captureOnCommitCallbacks(execute=True):
+            beleg.save(add_citations=True)
+        data = client.get("/stats/belege-by-context/").json()
+        self.assertIsNotNone(data["refreshed_at"])
+        self.assertEqual(
+            data["payload"][0],
+            {"id": beleg.pk, "value": beleg.hauptlemma, "item_count": 6},
+        )
+
+        tag = Tag.objects.create(name="counted")
+        with self.captureOnCommitCallbacks(execute=True):
+            beleg.tag.add(tag)
+        payload = client.get("/stats/tags-by-beleg/").json()["payload"]
+        self.assertIn({"id": tag.pk, "value": "counted", "item_count": 1}, payload)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.belege.clear()
+        payload = client.get("/stats/tags-by-beleg/").json()["payload"]
+        self.assertNotIn(tag.pk, [x["id"] for x in payload])
+
+        Citation.objects.filter(beleg=beleg).delete()
+        self.assertEqual(beleg.stats.citations, 6)
+        out = io.StringIO()
+        call_command("refresh_stats", stdout=out)
+        self.assertIn("Belege in", out.getvalue())
+        beleg.stats.refresh_from_db()
+        self.assertEqual(beleg.stats.citations, 0)
+
+        # the migration counts the rows existing before the stats tables
+        BelegStats.objects.all().delete()
+        TagStats.objects.all().delete()
+        migration = importlib.import_module("stats.migrations.0002_backfill_stats")
+        migration.backfill_stats(django_apps, None)
+        self.assertEqual(BelegStats.objects.count(), Beleg.objects.count())
+        self.assertEqual(TagStats.objects.get(tag=tag).belege, 0)
+        self.assertEqual(
+            BelegStats.objects.get(beleg=beleg).lautungen, beleg.lautungen.count()
+        )
+
+    def test_017_api_cache(self):
+        """Reference endpoints are cached with an ETag until their models change"""
+        response = client.get("/api/tags/")
+        etag = response["ETag"]
+        self.assertIn("no-cache", response["Cache-Control"])
+        # only the version of the group is read from the database, which is not
+        # counted against the query budget of the view
+        with self.assertNumQueries(1):
+            response = client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(1):
+            cached = client.get("/api/tags/")
+        self.assertEqual(cached["ETag"], etag)
+        self.assertIn(
+            'desc="0 queries", cache;desc="1 queries"', cached["Server-Timing"]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="uncached")
+        # a miss adds the version to the count and page of tags
+        with self.assertNumQueries(3):
+            response = client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertIn(
+            'desc="2 queries", cache;desc="1 queries"', response["Server-Timing"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("uncached", [x["name"] for x in response.json()["results"]])
+
+        client.get("/stats/tags-by-beleg/")
+        with self.assertNumQueries(1):
+            client.get("/stats/tags-by-beleg/")
+
+        sigle = Sigle.objects.first()
+        url = f"/api/siglen/{sigle.pk}/"
+        self.assertEqual(client.get(url).json()["name"], sigle.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            Sigle.objects.filter(pk=sigle.pk).update(name="renamed")
+            Sigle.objects.get(pk=sigle.pk).save()
+        self.assertEqual(client.get(url).json()["name"], "renamed")
+
+    def test_018_conditional_requests(self):
+        """Unchanged records are answered with 304 without building them"""
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        beleg.save(add_citations=True)
+        citation = beleg.citations.first()
+        for url in [
+            f"/api/belege-elastic-search/{beleg.pk}/",
+            f"/api/kontexte/{citation.pk}/",
+            f"/belege/{beleg.pk}/",
+        ]:
+            with self.subTest(url=url):
+                response = client.get(url)
+                etag = response["ETag"]
+                with self.assertNumQueries(1):
+                    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                response = client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+                )
+                self.assertEqual(response.status_code, 304)
+
+        url = f"/api/belege-elastic-search/{beleg.pk}/"
+        etag = client.get(url)["ETag"]
+        beleg.tag.add(Tag.objects.create(name="conditional"))
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(client.get("/api/kontexte/missing/").status_code, 404)
+
+    def test_019_search_fields(self):
+        """Fields with a trigram index are searched by substring with ILIKE"""
+        filterset = belege_api_views.CitationViewSet.filterset_class
+        self.assertEqual(filterset.search_fields, ("quote_text", "definition"))
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        beleg.save(add_citations=True)
+        citation = beleg.citations.exclude(quote_text="").first()
+        term = citation.quote_text[1:6].upper()
+        response = client.get("/api/kontexte/", {"quote_text": term})
+        ids = [x["id"] for x in response.json()["results"]]
+        self.assertIn(citation.pk, ids)
+        expected = Citation.objects.filter(quote_text__icontains=term)
+        self.assertEqual(len(ids), expected.count())
+
+        queryset = Citation.objects.filter(quote_text__ilike_contains="%")
+        self.assertIn("ILIKE", str(queryset.query))
+        self.assertFalse(queryset.exists())
+
+    def test_020_related_pk_filters(self):
+        """Filtersets are built once; related objects are checked, not loaded"""
+        filterset = get_filterset_for_model(Citation, fields=["dboe_id", "beleg"])
+        self.assertIs(filterset, belege_api_views.CitationViewSet.filterset_class)
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        beleg.save(add_citations=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/kontexte/", {"beleg": beleg.pk})
+        self.assertEqual(response.json()["count"], 6)
+        # exists() on the primary key instead of loading the Beleg
+        self.assertTrue(queries[0]["sql"].startswith('SELECT 1 AS "a"'))
+        self.assertEqual(len(queries), 3)
+        response = client.get("/api/kontexte/", {"beleg": "missing"})
+        self.assertEqual(response.status_code, 400)
+        response = client.get("/api/belege-elastic-search/", {"collection": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_021_query_budgets(self):
+        """The API views stay within their query budget, also for larger pages"""
+        for beleg in Beleg.objects.all():
+            beleg.save(add_citations=True, add_lautungen=True, add_sense=True)
+        client.login(**USER)
+        urls = [
+            f"/api/{prefix}/{suffix}"
+            for prefix, viewset, basename in router.registry
+            for suffix in ["", "?page_size=50"]
+        ]
+        urls += self.get_stats_endpoints() + ["/belege/e224_qdb-d1e65954/"]
+        # the cache versions are only created once per database
+        for group in settings.API_CACHE_TIMEOUTS:
+            get_version(group)
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                queries = re.search(r'desc="(\d+) queries"', response["Server-Timing"])
+                func = response.resolver_match.func
+                view_class = getattr(func, "cls", getattr(func, "view_class", None))
+                budget = getattr(view_class, "query_budget", settings.QUERY_BUDGET)
+                self.assertLessEqual(int(queries.group(1)), budget)
+
+        # only for staff users and the scraper's token
+        self.assertEqual(client.get("/metrics/").status_code, 403)
+        client.logout()
+        with self.settings(METRICS_TOKEN="secret"):
+            response = client.get("/metrics/", HTTP_AUTHORIZATION="Bearer wrong")
+            self.assertEqual(response.status_code, 403)
+            response = client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        metrics = response.content.decode()
+        self.assertIn("# TYPE dboe_db_queries_total counter", metrics)
+        self.assertIn(
+            'dboe_db_queries_total{view="citation-list",method="GET"}', metrics
+        )
+
+    def test_022_lemma_assigned_task(self):
+        """The current tasks of all lemmata are fetched with a constant number of queries"""
+        user = User.objects.get(username=USER["username"])
+        simplex = Lemma.objects.create(org="simplex", lemmatisierung="simplex")
+        task = Edit_of_article.objects.create(lemma=simplex, user=user, current=True)
+        Edit_of_article.objects.create(lemma=simplex, user=None, current=False)
+        for i in range(20):
+            Lemma.objects.create(org=f"complex {i}", simplex=simplex)
+            Lemma.objects.create(org=f"lemma {i}")
+        # count, lemmata with their simplices, tasks of the lemmata and of the simplices
+        with self.assertNumQueries(4):
+            response = client.get("/api/lemmas/", {"page_size": 100})
+        results = {x["org"]: x["assigned_task"] for x in response.json()["results"]}
+        self.assertIsNone(results["lemma 0"])
+        self.assertEqual(results["complex 0"], results["simplex"])
+        self.assertEqual(results["simplex"]["user_name"], USER["username"])
+        self.assertTrue(results["simplex"]["user"].endswith(f"/api/users/{user.pk}/"))
+        self.assertTrue(
+            results["simplex"]["task"].endswith(f"/api/article_edits/{task.pk}/")
+        )
+
+    def test_023_collection_belege(self):
+        """Collections are listed without their Belege, those are paginated separately"""
+        belege = list(Beleg.objects.order_by("pk")[:3])
+        tag = Tag.objects.create(name="test tag", color="#ff0000")
+        belege[0].tag.add(tag)
+        collection = Collection.objects.create(title="test collection")
+        collection.beleg.add(belege[0])
+        with CaptureQueriesContext(connection) as small:
+            client.get("/api/collections/")
+        collection.beleg.add(*belege)
+        with CaptureQueriesContext(connection) as large:
+            response = client.get("/api/collections/")
+        self.assertEqual(len(small), len(large))
+        self.assertNotIn("beleg", response.json()["results"][0])
+
+        response = client.get(f"/api/collections/{collection.pk}/")
+        self.assertEqual(sorted(response.json()["beleg"]), sorted(x.pk for x in belege))
+        response = client.get(
+            f"/api/collections/{collection.pk}/belege/", {"page_size": 2}
+        )
+        data = response.json()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(
+            [x["id"] for x in data["results"]], [belege[0].pk, belege[1].pk]
+        )
+        self.assertEqual(
+            data["results"][0]["tags"],
+            [{"name": "test tag", "color": "#ff0000", "id": tag.pk}],
+        )
+        response = client.get("/api/collections/0/belege/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_024_index_queue(self):
+        """Changes are coalesced in the queue and dequeued once indexed"""
+        IndexQueueItem.objects.all().delete()
+        beleg, other = Beleg.objects.order_by("pk")[:2]
+        beleg.save()
+        queued_at = IndexQueueItem.objects.get().queued_at
+        beleg.save()
+        IndexQueueItem.enqueue([other.pk, other.pk, "missing"])
+        self.assertEqual(IndexQueueItem.objects.count(), 3)
+        self.assertGreater(IndexQueueItem.objects.get(pk=beleg.pk).queued_at, queued_at)
+
+        with (
+            mock.patch.object(index_queue, "bulk", return_value=(2, [])) as bulk,
+            mock.patch.object(index_queue, "print", create=True),
+        ):
+            # the document of a Beleg which cannot be serialized stays queued
+            with mock.patch.object(
+                Beleg, "sanitize_representation", side_effect=ValueError
+            ):
+                self.assertEqual(index_queue.flush_queue(batch_size=1), 0)
+            self.assertEqual(IndexQueueItem.objects.count(), 3)
+            self.assertEqual(IndexQueueItem.objects.get(pk=beleg.pk).attempts, 1)
+            self.assertEqual(bulk.call_args.args[1], [])
+
+            # the rejected document stays queued, the missing Beleg is deleted
+            bulk.return_value = (
+                1,
+                [
+                    {"index": {"_id": other.pk, "status": 429, "error": "busy"}},
+                    {"delete": {"_id": "missing", "status": 404}},
+                ],
+            )
+            self.assertEqual(index_queue.flush_queue(), 2)
+            actions = {x["_id"]: x["_op_type"] for x in bulk.call_args.args[1]}
+            self.assertEqual(
+                actions, {beleg.pk: "index", other.pk: "index", "missing": "delete"}
+            )
+            self.assertEqual(
+                list(IndexQueueItem.objects.values_list("pk", flat=True)), [other.pk]
+            )
+
+            bulk.return_value = (1, [])
+            self.assertEqual(index_queue.flush_queue(), 1)
+            self.assertFalse(IndexQueueItem.objects.exists())
+            self.assertEqual(index_queue.flush_queue(), 0)
+
+            # a Beleg failing repeatedly is parked until it changes again
+            IndexQueueItem.enqueue([beleg.pk])
+            with (
+                mock.patch.object(
+                    Beleg, "sanitize_representation", side_effect=ValueError
+                ),
+                mock.patch(
+                    "belege.management.commands.index_queue.os_available",
+                    return_value=True,
+                ),
+                mock.patch("belege.management.commands.index_queue.print", create=True),
+            ):
+                call_command("index_queue", "--once")
+                self.assertEqual(IndexQueueItem.objects.get().attempts, 1)
+                for _ in range(index_queue.MAX_ATTEMPTS - 1):
+                    index_queue.flush_queue()
+                bulk.reset_mock()
+                self.assertEqual(index_queue.flush_queue(), 0)
+                bulk.assert_not_called()
+            self.assertEqual(
+                index_queue.queue_stats(), {"depth": 0, "lag": 0.0, "parked": 1}
+            )
+            IndexQueueItem.enqueue([beleg.pk])
+            self.assertEqual(index_queue.queue_stats()["depth"], 1)
+
+        with self.assertRaises(CommandError):
+            call_command("index_queue", "--batch-size", "0")
+
+    def test_025_import_resumes_from_checkpoint(self):
+        """The importer parses files in parallel and resumes after an interruption"""
+        import_command = importlib.import_module("belege.management.commands.import")
+        belege = {x.pk: x for x in Beleg.objects.all()}
+        for beleg in belege.values():
+            beleg.save(add_citations=True, add_lautungen=True)
+        citations = Citation.objects.count()
+        Beleg.objects.all().delete()
+        write_records = import_command.Command.write_records
+        written = []
+        interrupted = []
+
+        def interrupt_second_file(command, records, batch_size):
+            if written and not interrupted:
+                interrupted.append(records)
+                raise RuntimeError("interrupted")
+            written.append([x.pk for x, _ in records])
+            write_records(command, records, batch_size)
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            mock.patch.object(import_command, "print", create=True),
+            # the test runs in a transaction, the forked workers do not use the connection
+            mock.patch.object(import_command.connections, "close_all"),
+            mock.patch.object(
+                import_command.Command,
+                "write_records",
+                autospec=True,
+                side_effect=interrupt_second_file,
+            ),
+        ):
+            for i, beleg in enumerate(sorted(belege.values(), key=lambda x: x.pk)):
+                with open(f"{tmp}/{i}.xml", "w", encoding="utf-8") as fp:
+                    fp.write(
+                        f'<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader>'
+                        f"<xenoData>{beleg.xeno_data}</xenoData></teiHeader>"
+                        f"<text><body>{beleg.orig_xml}</body></text></TEI>"
+                    )
+            checkpoint = f"{tmp}/checkpoint.json"
+            options = {"workers": 2, "checkpoint": checkpoint}
+            with self.assertRaisesMessage(RuntimeError, "interrupted"):
+                call_command("import", f"{tmp}/*.xml", **options)
+            self.assertEqual(
+                list(Beleg.objects.values_list("pk", flat=True)), written[0]
+            )
+            with open(checkpoint, encoding="utf-8") as fp:
+                self.assertEqual(json.load(fp)["completed"], [f"{tmp}/0.xml"])
+
+            written.clear()
+            call_command("import", f"{tmp}/*.xml", **options)
+
+        # the already imported file was not imported again
+        self.assertEqual(sorted(sum(written, [])), sorted(belege)[1:])
+        self.assertEqual(Beleg.objects.count(), len(belege))
+        self.assertEqual(Citation.objects.count(), citations)
+        for beleg in Beleg.objects.all():
+            self.assertEqual(beleg.hauptlemma, belege[beleg.pk].hauptlemma)
+            self.assertEqual(beleg.xeno_data, belege[beleg.pk].xeno_data)
+
+    def test_026_extraction_plan(self):
+        """The compiled extraction plans extract the same values as the xpath extras"""
+        for beleg in Beleg.objects.all():
+            entry = parse_xml(beleg.orig_xml)
+            nodes = [(Beleg, entry)] + [
+                (model_class, node)
+                for model_class, xpath_expr in [
+                    (Citation, "./tei:cit"),
+                    (ZusatzLemma, "./tei:cit/tei:re"),
+                    (Lautung, "./tei:form[@type='lautung']"),
+                    (LehnWort, "./tei:form[@type='lehnwort']"),
+                    (Sense, "./tei:sense"),
+                ]
+                for node in entry.xpath(xpath_expr, namespaces=NSMAP)
+            ]
+            for model_class, node in nodes:
+                for flags in [{}, {"strip": True, "truncate": True}]:
+                    compiled, legacy = model_class(), model_class()
+                    self.assertEqual(
+                        extract_xml_fields(compiled, node, **flags),
+                        extract_xml_fields_legacy(legacy, node, **flags),
+                    )
+                    fields = [x.field_name for x in get_extraction_plan(model_class)]
+                    self.assertTrue(fields)
+                    for field in fields:
+                        self.assertEqual(
+                            getattr(compiled, field), getattr(legacy, field), field
+                        )
+
+        # the plans are built on first use, once per model class
+        self.assertIs(get_extraction_plan(Beleg), get_extraction_plan(Beleg))
+        self.assertEqual(get_extraction_plan(User), [])
+        self.assertFalse(extract_xml_fields(User(), parse_xml(beleg.orig_xml)))
+
+    def test_027_lazy_xml(self):
+        """orig_xml is parsed on first use only and deferred by with_related()"""
+        beleg = Beleg.objects.get(dboe_id="e224_qdb-d1e65954")
+        value = beleg.orig_xml
+        self.assertIsInstance(value, LazyXML)
+        self.assertIsNone(value._element)
+        self.assertTrue(value.raw.startswith("<"))
+        self.assertEqual(ET.QName(value.tag).localname, "entry")
+        element = value._element
+        self.assertIsNotNone(element)
+        self.assertIs(parse_xml(value), element)
+
+        beleg.save(add_citations=True)
+        beleg = Beleg.objects.with_related().get(dboe_id="e224_qdb-d1e65954")
+        self.assertIn("orig_xml", beleg.get_deferred_fields())
+        citation = beleg.citations.all()[0]
+        self.assertIn("orig_xml", citation.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertIsInstance(beleg.orig_xml, LazyXML)
+
+    def test_028_indexing_pipeline(self):
+        """Rejected documents are retried with backoff, failures block the high-water mark"""
+        requests = []
+        rejected = {}
+
+        def streaming_bulk(client, actions, **kwargs):
+            ids = [x["_id"] for x in actions]
+            requests.append(ids)
+            for x in ids:
+                status = rejected.get(x, [200]).pop(0)
+                if status != 200:
+                    yield False, {"index": {"_id": x, "status": status, "error": "x"}}
+
+        documents = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+        backoff = indexing.AdaptiveBackoff()
+        indexer = indexing.Indexer(None, "dboe", backoff, max_retries=2)
+        with (
+            mock.patch.object(indexing, "streaming_bulk", streaming_bulk),
+            mock.patch.object(indexing, "sleep") as sleep,
+            mock.patch.object(indexing, "print", create=True),
+        ):
+            # a is rejected by a busy cluster once, b is invalid
+            rejected.update({"a": [429, 200], "b": [400]})
+            self.assertEqual(indexer.index(documents), ["b"])
+            self.assertEqual(requests, [["a", "b", "c"], ["a"]])
+            sleep.assert_called_once_with(backoff.initial)
+            self.assertEqual(backoff.delay, 0.0)
+
+            # c times out on every attempt
+            requests.clear()
+            rejected.clear()
+            rejected["c"] = ["TIMEOUT"] * 3
+            self.assertEqual(indexer.index(documents), ["c"])
+            self.assertEqual(requests, [["a", "b", "c"], ["c"], ["c"]])
+            self.assertEqual(backoff.delay, 4 * backoff.initial)
+
+            # the ids failing in the pipeline are collected, rejected by
+            # OpenSearch as well as failing to serialize
+            backoff.delay = 0.0
+            rejected.clear()
+            Beleg.objects.refresh_representations(list(Beleg.objects.all()))
+            failing, broken = Beleg.objects.order_by("pk").values_list("pk", flat=True)[
+                :2
+            ]
+            rejected[failing] = [400]
+            Beleg.objects.filter(pk=broken).update(representation=None)
+            with (
+                mock.patch.object(indexing.connections, "close_all"),
+                mock.patch.object(
+                    Beleg, "build_representation", side_effect=ValueError
+                ),
+            ):
+                stats = indexing.index_belege(
+                    Beleg.objects.defer("orig_xml").order_by("pk"),
+                    None,
+                    "dboe",
+                    batch_size=2,
+                    workers=2,
+                )
+        self.assertCountEqual(stats.failed, [failing, broken])
+        self.assertEqual(stats.docs["index"], Beleg.objects.count() - 1)
+
+        # the high-water mark is only moved by runs without failures
+        with (
+            mock.patch.object(index_command, "os_available", return_value=True),
+            mock.patch.object(index_command, "index_belege") as index_belege,
+            mock.patch.object(index_command, "print", create=True),
+        ):
+            index_belege.return_value.failed = [failing]
+            call_command("index", "--changed")
+            self.assertFalse(IndexState.objects.exists())
+            index_belege.return_value.failed = []
+            call_command("index", "--changed")
+            indexed_until = IndexState.objects.get().indexed_until
+            call_command("index", "--changed")
+        self.assertGreater(IndexState.objects.get().indexed_until, indexed_until)
@@ -0,0 +1,277 @@
+"""Former implementations of optimized code paths, the tests compare their results."""
+
+from typing import Iterable
+
+from acdh_tei_pyutils.utils import extract_fulltext
+from acdh_xml_pyutils.xml import NSMAP
+from django.db import models
+from django.db.models.query import QuerySet
+from django_jsonform.models.fields import ArrayField
+
+
+def extract_xml_fields_legacy(instance, node, strip=False, truncate=False):
+    """``extract_xml_fields`` evaluating the xpath strings of the fields one by one."""
+    truncated = False
+    for field in instance._meta.fields:
+        extra = getattr(field, "extra", {})
+        if "xpath" not in extra or getattr(instance, field.name):
+            continue
+        if isinstance(field, ArrayField):
+            values = []
+            for result in node.xpath(extra["xpath"], namespaces=NSMAP):
+                try:
+                    value = extract_fulltext(result)
+                except AttributeError:
+                    value = str(result)
+                values.append(value.strip())
+            setattr(instance, field.name, values)
+        elif isinstance(field, (models.CharField, models.TextField)):
+            try:
+                result = node.xpath(extra["xpath"], namespaces=NSMAP)[0]
+            except IndexError:
+                continue
+            try:
+                value = extract_fulltext(result)
+            except AttributeError:
+                value = str(result)
+            if (
+                truncate
+                and isinstance(field, models.CharField)
+                and field.max_length
+                and len(value) > field.max_length
+            ):
+                value = value[: field.max_length]
+                truncated = True
+            if strip:
+                value = value.strip()
+            setattr(instance, field.name, value)
+    return truncated
+
+
+def build_representation_legacy(beleg, base=None):
+    """The former ``Beleg.build_representation``, which scans the related objects repeatedly."""
+
+    # Build the initial base if none was provided
+    if base is None:
+        base = {
+            "id": beleg.dboe_id,
+            "hl": beleg.hauptlemma,
+            "nl": beleg.nebenlemma,
+            "qu": beleg.quelle,
+            "bibl": beleg.bibl,
+            "pos": beleg.pos,
+            "archivzeile": beleg.archivzeile,
+        }
+
+    ret = dict(base)  # copy so we don't mutate caller provided dict
+
+    # Collect simple references
+    ret["tustep"] = beleg.xeno_data
+    ret["facs"] = [f.file_name for f in beleg.facs.all()]
+    verweise = []
+    for x in [
+        "ref_type_dbo",
+        "ref_type_sni",
+        "xr_type_verweise_o",
+        "xr_type_verweise_b",
+    ]:
+        value = getattr(beleg, x, None)
+        if value:
+            verweise.append(value)
+
+    try:
+        cit_fragebogen_nr = " ".join(
+            c.fragebogen_nummer for c in beleg.citations.all() if c.fragebogen_nummer
+        )
+    except TypeError:
+        cit_fragebogen_nr = ""
+    if beleg.fragebogen_nummer:
+        fragebogen_nr = f"{beleg.fragebogen_nummer} "
+    else:
+        fragebogen_nr = ""
+    ret["nr"] = f"{fragebogen_nr}{cit_fragebogen_nr}"
+    ret["verweis"] = verweise
+    ret["page"] = beleg.quelle_page
+    ret["etym"] = beleg.etym
+    ret["a"] = beleg.archivzeile
+    ret["tags"] = [x.name for x in beleg.tag.all()]
+
+    siglen = set()
+    bundeslaender = set()
+    gregion = set()
+    kregion = set()
+    orte = set()
+    orig_orte = list()
+    for x in beleg.belegsigle_set.all():
+        siglen.add(x.sigle.sigle)
+        orte.add(x.sigle.name)
+        for y in x.sigle.orig_names:
+            orig_orte.append(y)
+        try:
+            bundeslaender.add(f"{x.sigle.bl}")
+        except AttributeError:
+            pass
+        try:
+            gregion.add(f"{x.sigle.gr}")
+        except AttributeError:
+            pass
+        try:
+            kregion.add(f"{x.sigle.kr}")
+        except AttributeError:
+            pass
+    ret["siglen"] = list(siglen)
+    ret["bundeslaender"] = list(bundeslaender)
+    ret["gregion"] = list(gregion)
+    ret["kregion"] = list(kregion)
+    ret["orte"] = list(orte)
+    ret["orig_orte"] = orig_orte
+
+    # DV/LW*
+    ret["dv_lw_star"] = []
+    for x in beleg.note_diverse:
+        ret["dv_lw_star"].append(x)
+
+    # Lautungen
+    for x in beleg.lautungen.all():
+        gram_key = f"gram_lt{x.number}"
+        ret[gram_key] = [x.pron_gram]
+        teut_key = f"lt{x.number}_teuthonista"
+        ret[teut_key] = [x.pron]
+
+    # Lehnwörter
+    for x in beleg.lehnwoerter.all():
+        number = x.number
+        ret[f"lw{number}"] = x.pron
+
+    # Notes Lautung - use prefetched data
+    ret["anm_lt_star"] = [x.content for x in beleg.note_lautung.all()]
+
+    # Use prefetched citations
+    citations_list = list(beleg.citations.all())
+    try:
+        first_citation = next((c for c in citations_list if c.number == 1), None)
+        if first_citation:
+            ret["kl_kt1"] = first_citation.interpration
+    except AttributeError:
+        pass
+
+    ret["anm_kt_star"] = []
+    ret["bd_kt_star"] = []
+    ret["wbd_kt_star"] = []
+    ret["vrw_kt_star"] = []
+    ret["dv_kt_star"] = []
+
+    for x in citations_list:
+        if x.corresp and "this:LT" in x.corresp:
+            cur_lt = x.corresp.split(":")[-1]
+            key = f"kt_{cur_lt.lower()}"
+            value = x.quote_text
+            ret[key] = value
+        if x.definition_corresp is None and x.definition:
+            ret["bd_kt_star"].append(f"{x.definition} ›KT {x.number}")
+        elif x.definition:
+            ret["wbd_kt_star"].append(f"{x.definition} ›WBD/KT{x.number}/KT{x.number}")
+        ret[f"kt{x.number}"] = [x.quote_text]
+        for y in x.zusatz_lemma.all():
+            ret[f"zl{y.number}_kt{x.number}"] = [
+                f"{y.form_orth}||{y.pos}||{getattr(y, 'gram', None) or ''}"
+            ]
+        for y in x.note_diverse:
+            ret["dv_kt_star"].append(f"{y} ›KT {x.number}")
+        if x.xr:
+            ret["vrw_kt_star"].append(f"O: {x.xr} ›KT{x.number}")
+        if x.note_anmerkung_o:
+            ret["anm_kt_star"].append(f"O: {x.note_anmerkung_o} ›KT{x.number}")
+        if x.note_anmerkung_b:
+            ret["anm_kt_star"].append(f"B: {x.note_anmerkung_b} ›KT{x.number}")
+
+    # Use prefetched bedeutungen - filter in Python
+    bedeutungen_list = list(beleg.bedeutungen.all())
+    ret["bd_lw_star"] = [
+        b.definition for b in bedeutungen_list if b.corresp_to and "LW" in b.corresp_to
+    ]
+
+    for i in ["1", "2"]:
+        # Filter citations in Python instead of using QuerySet.filter()
+        ret[f"bd_kt_lt{i}"] = [
+            c.definition
+            for c in citations_list
+            if c.corresp == f"this:LT{i}"
+            and c.definition_corresp is None
+            and c.definition
+        ]
+        ret[f"kt_lt{i}"] = [
+            c.quote_text
+            for c in citations_list
+            if c.corresp == f"this:LT{i}" and c.quote_text
+        ]
+
+        # Get matching citations and their zusatz_lemma from prefetched data
+        kontext = [c for c in citations_list if c.corresp == f"this:LT{i}"]
+        ret[f"zl1_kt_lt{i}"] = ""
+        ret[f"zl2_kt_lt{i}"] = ""
+        n = 1
+        for citation in kontext:
+            for y in citation.zusatz_lemma.all():
+                ret[f"zl{n}_kt_lt{i}"] = (
+                    f"{y.form_orth}||{getattr(y, 'pos', None) or ''}||{getattr(y, 'gram', None) or ''}"
+                )
+                n += 1
+
+    # Filter note_lautung in Python
+    ret["anm_lw_star"] = []
+    for x in beleg.note_lautung.all():
+        if x.corresp_to and "this:LW1" in x.corresp_to.lower():
+            ret["anm_lw_star"].append(
+                f"{x.resp}: {x.content} ›{x.corresp_to.replace('this:', '')}"
+            )
+
+    # Filter bedeutungen in Python
+    ret["bd_lt_star"] = []
+    for x in bedeutungen_list:
+        if x.corresp_to and "LT" in x.corresp_to:
+            if x.note_anmerkung_o:
+                ret["bd_lt_star"].append(
+                    f"{x.definition}ANMO: {x.note_anmerkung_o} ›LT{x.number}"
+                )
+            else:
+                ret["bd_lt_star"].append(f"{x.definition} ›LT{x.number}")
+
+    for i, x in enumerate(beleg.zitierweise, start=1):
+        ret[f"zw{i}"] = [x]
+    return ret
+
+
+def transform_record_legacy(raw: dict) -> dict:
+    """The former ``transform_record``, which probes the type of every value."""
+    out = {}
+    for key, v in raw.items():
+        # Normalize QuerySets explicitly
+        if isinstance(v, QuerySet):
+            v = list(v)
+        # Some Django related managers may appear (e.g. ManyRelatedManager);
+        # catch generic iterables except strings/bytes
+        elif (
+            not isinstance(v, (str, bytes, list, dict))
+            and hasattr(v, "__iter__")
+            and not isinstance(v, Iterable)  # narrow - safety; Iterable imported
+        ):
+            # Fallback path (likely not hit often)
+            try:
+                v = list(v)  # type: ignore[arg-type]
+            except Exception:
+                pass
+
+        if key == "id":
+            # Keep primary key as-is (string)
+            out[key] = str(v)
+        elif v in ("", None, []):
+            out[key] = []
+        elif hasattr(v, "exists") and callable(getattr(v, "exists")) and not v.exists():
+            out[key] = []
+        elif isinstance(v, list):
+            # Coerce every element to string for Typesense
+            out[key] = [str(x) for x in v if x not in (None, "")]
+        else:
+            out[key] = [str(v)]
+    return out
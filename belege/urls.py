@@ -1,9 +1,13 @@
 from django.urls import path
 
-from belege.views import BelegDetailView
+from belege.views import BelegDetailView, CollectionTeiView, SigleTeiView
 
 app_name = "belege"
 
 urlpatterns = [
+    path(
+        "tei/collection/<int:pk>/", CollectionTeiView.as_view(), name="collection-tei"
+    ),
+    path("tei/sigle/<str:pk>/", SigleTeiView.as_view(), name="sigle-tei"),
     path("<str:pk>/", BelegDetailView.as_view(), name="beleg-detail"),
 ]
@@ -1,37 +1,91 @@
-from typing import Iterable
+import re
+from functools import cache
+from typing import Callable, Iterable
 
-from django.db.models.query import QuerySet
+
+def normalize_text(value) -> list:
+    """A single text value, e.g. ``hl``; empty values become an empty list."""
+    return [value] if value else []
+
+
+def normalize_texts(values) -> list:
+    """A list of text values, e.g. ``tags``; empty items are dropped."""
+    return [x for x in values if x] if values else []
+
+
+def normalize_value(value) -> list:
+    """Any other value: lists are stringified item by item, anything else is wrapped."""
+    if value in ("", None, []):
+        return []
+    if isinstance(value, list):
+        return [str(x) for x in value if x not in (None, "")]
+    return [str(value)]
+
+
+# the keys of Beleg.build_representation; all values are strings, lists of
+# strings or None
+TEXT_KEYS = {
+    "hl",
+    "nl",
+    "qu",
+    "bibl",
+    "pos",
+    "archivzeile",
+    "tustep",
+    "nr",
+    "page",
+    "a",
+    "kl_kt1",
+}
+LIST_KEYS = {
+    "facs",
+    "verweis",
+    "etym",
+    "tags",
+    "siglen",
+    "bundeslaender",
+    "gregion",
+    "kregion",
+    "orte",
+    "orig_orte",
+    "dv_lw_star",
+    "anm_lt_star",
+    "anm_kt_star",
+    "bd_kt_star",
+    "wbd_kt_star",
+    "vrw_kt_star",
+    "dv_kt_star",
+    "bd_lw_star",
+    "anm_lw_star",
+    "bd_lt_star",
+}
+# numbered keys, e.g. kt3, zl1_kt3 or lt2_teuthonista
+LIST_KEY_PATTERN = re.compile(
+    r"gram_lt\d+|lt\d+_teuthonista|kt\d+|zl\d+_kt\d+|bd_kt_lt[12]|kt_lt[12]|zw\d+"
+)
+TEXT_KEY_PATTERN = re.compile(r"lw\d+|zl\d+_kt_lt[12]")
+
+
+@cache
+def normalizer_for(key: str) -> Callable:
+    """Return the function normalizing the values of ``key``."""
+    if key == "id":
+        return str
+    if key in TEXT_KEYS or TEXT_KEY_PATTERN.fullmatch(key):
+        return normalize_text
+    if key in LIST_KEYS or LIST_KEY_PATTERN.fullmatch(key):
+        return normalize_texts
+    return normalize_value
 
 
 def transform_record(raw: dict) -> dict:
-    out = {}
-    for key, v in raw.items():
-        # Normalize QuerySets explicitly
-        if isinstance(v, QuerySet):
-            v = list(v)
-        # Some Django related managers may appear (e.g. ManyRelatedManager);
-        # catch generic iterables except strings/bytes
-        elif (
-            not isinstance(v, (str, bytes, list, dict))
-            and hasattr(v, "__iter__")
-            and not isinstance(v, Iterable)  # narrow - safety; Iterable imported
-        ):
-            # Fallback path (likely not hit often)
-            try:
-                v = list(v)  # type: ignore[arg-type]
-            except Exception:
-                pass
-
-        if key == "id":
-            # Keep primary key as-is (string)
-            out[key] = str(v)
-        elif v in ("", None, []):
-            out[key] = []
-        elif hasattr(v, "exists") and callable(getattr(v, "exists")) and not v.exists():
-            out[key] = []
-        elif isinstance(v, list):
-            # Coerce every element to string for Typesense
-            out[key] = [str(x) for x in v if x not in (None, "")]
-        else:
-            out[key] = [str(v)]
-    return out
+    """Normalize a representation for the search index.
+
+    The id is kept as string, all other values become lists of non-empty strings.
+    """
+    return {key: normalizer_for(key)(value) for key, value in raw.items()}
+
+
+def transform_records(raws: Iterable[dict]) -> list[dict]:
+    """Normalize a batch of representations, see ``transform_record``."""
+    return [transform_record(raw) for raw in raws]
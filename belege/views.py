@@ -1,9 +1,44 @@
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.generic.detail import DetailView
 
+from annotations.models import Collection
+from belege.conditional import conditional, tei_version
+from belege.export import export_tei, filter_belege, streaming_response
 from belege.models import Beleg
+from siglen.models import Sigle
 
 
+@method_decorator(conditional(tei_version), name="get")
 class BelegDetailView(DetailView):
+    # one query per prefetched relation, see BelegManager.with_tei_related()
+    query_budget = 14
     model = Beleg
+    queryset = Beleg.objects.with_tei_related()
     content_type = "application/xml"
     template_name = "belege/beleg_detail.j2"
+
+
+class CollectionTeiView(View):
+    """All Belege of a collection as one TEI document."""
+
+    def get(self, request, pk):
+        collection = get_object_or_404(Collection, pk=pk)
+        belege = filter_belege(Beleg.objects.with_tei_related(), collection=pk)
+        content = export_tei(belege, collection.title, f"collection_{pk}")
+        return streaming_response(
+            request, content, "application/xml", f"collection_{pk}.xml"
+        )
+
+
+class SigleTeiView(View):
+    """All Belege of a Sigle, or of the Siglen within a Bundesland or region, as one TEI document."""
+
+    def get(self, request, pk):
+        sigle = get_object_or_404(Sigle, pk=pk)
+        belege = filter_belege(Beleg.objects.with_tei_related(), sigle=pk)
+        content = export_tei(belege, sigle.name, f"sigle_{pk}")
+        return streaming_response(
+            request, content, "application/xml", f"sigle_{pk}.xml"
+        )
@@ -0,0 +1,149 @@
+import hashlib
+from functools import wraps
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+from dboeannotation.middleware import cache_queries
+
+# aliases of the caches in settings.CACHES holding the responses and their versions
+API_CACHE = "api"
+API_VERSION_CACHE = "api_versions"
+# media types of responses which are cached, the browsable API renders per user HTML
+CACHED_MEDIA_TYPES = {"application/json"}
+
+
+def get_cache():
+    return caches[API_CACHE]
+
+
+def get_version_cache():
+    """The versions are shared by all processes, the responses may be cached per process."""
+    return caches[API_VERSION_CACHE]
+
+
+def get_timeout(group):
+    """TTL of the responses of ``group`` in seconds, see ``settings.API_CACHE_TIMEOUTS``."""
+    timeouts = settings.API_CACHE_TIMEOUTS
+    return timeouts.get(group, timeouts["default"])
+
+
+def get_version(group):
+    """Current version of ``group``; cache keys of older versions are never read again."""
+    cache = get_version_cache()
+    key = f"api:version:{group}"
+    with cache_queries():
+        version = cache.get(key)
+        if version is None:
+            version = time_ns()
+            # add() keeps the version of a concurrent request
+            if not cache.add(key, version, None):
+                version = cache.get(key)
+    return version
+
+
+def invalidate(*groups):
+    """Drop the cached responses of ``groups`` (immediately)."""
+    with cache_queries():
+        get_version_cache().set_many(
+            {f"api:version:{group}": time_ns() for group in groups}, None
+        )
+
+
+def invalidate_on_commit(*groups):
+    """Drop the cached responses of ``groups`` once the transaction is committed.
+
+    Invalidating earlier would let a concurrent request cache the old data again.
+    """
+    transaction.on_commit(lambda: invalidate(*groups))
+
+
+def cache_key(request, group):
+    # the responses contain absolute URLs
+    variant = f"{request.build_absolute_uri()}\n{request.META.get('HTTP_ACCEPT', '')}"
+    digest = hashlib.md5(variant.encode()).hexdigest()
+    return f"api:{group}:{get_version(group)}:{digest}"
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return "*" in etags or etag in etags
+
+
+def build_response(request, content, content_type, etag):
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    response["ETag"] = etag
+    # clients may keep the response but have to revalidate it with If-None-Match
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+def serve_cached(request, group, timeout, view, *args, **kwargs):
+    """Return the cached response of ``view`` or call and cache it.
+
+    Only successful GET and HEAD requests answered with JSON are cached; the
+    ETag is the hash of the content, a matching If-None-Match gets a 304.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return view(request, *args, **kwargs)
+    cache = get_cache()
+    key = cache_key(request, group)
+    cached = cache.get(key)
+    if cached is not None:
+        return build_response(request, *cached)
+
+    response = view(request, *args, **kwargs)
+    media_type = getattr(response, "accepted_media_type", None)
+    if response.status_code != 200 or media_type not in CACHED_MEDIA_TYPES:
+        return response
+    response.render()
+    content = response.content
+    etag = quote_etag(hashlib.md5(content).hexdigest())
+    cached = (content, response["Content-Type"], etag)
+    cache.set(key, cached, get_timeout(group) if timeout is None else timeout)
+    return build_response(request, *cached)
+
+
+def cache_response(group, timeout=None):
+    """Decorator caching the responses of an ``@api_view`` function in ``group``."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return serve_cached(request, group, timeout, view, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+class CachedResponseMixin:
+    """Caches the read only responses of a viewset in ``cache_group``.
+
+    ``cache_timeout`` overrides the TTL configured for the group.
+    """
+
+    cache_group = None
+    cache_timeout = None
+
+    def dispatch(self, request, *args, **kwargs):
+        return serve_cached(
+            request,
+            self.cache_group,
+            self.cache_timeout,
+            super().dispatch,
+            *args,
+            **kwargs,
+        )
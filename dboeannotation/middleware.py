@@ -0,0 +1,191 @@
+import logging
+import secrets
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+# counters per view and method, in the order of METRICS
+METRICS = [
+    ("requests_total", "Number of requests"),
+    ("db_queries_total", "Number of database queries"),
+    ("cache_queries_total", "Number of database queries of the response cache"),
+    ("db_seconds_total", "Time spent in database queries"),
+    ("serialize_seconds_total", "Time spent rendering the responses"),
+    ("response_bytes_total", "Size of the response bodies (without streamed ones)"),
+    ("request_seconds_total", "Time spent handling the requests"),
+]
+
+# set while the response cache reads or writes its versions
+in_cache = ContextVar("in_cache", default=False)
+
+
+@contextmanager
+def cache_queries():
+    """Queries of the response cache, which are not counted against the query budget."""
+    token = in_cache.set(True)
+    try:
+        yield
+    finally:
+        in_cache.reset(token)
+
+
+class RequestMetrics:
+    """Queries and timings of one request; also the ``execute_wrapper`` counting them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.cache_queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.total_seconds = 0.0
+        self.size = 0
+        self.budget = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += perf_counter() - start
+            if in_cache.get():
+                self.cache_queries += 1
+            else:
+                self.queries += 1
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+                f'cache;desc="{self.cache_queries} queries"',
+                f"serialize;dur={self.serialize_seconds * 1000:.1f}",
+                f"total;dur={self.total_seconds * 1000:.1f}",
+            ]
+        )
+
+
+class MetricsRegistry:
+    """Sums of the request metrics per view and method of this process."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = defaultdict(lambda: [0] * len(METRICS))
+
+    def add(self, view, method, metrics):
+        values = [
+            1,
+            metrics.queries,
+            metrics.cache_queries,
+            metrics.db_seconds,
+            metrics.serialize_seconds,
+            metrics.size,
+            metrics.total_seconds,
+        ]
+        with self.lock:
+            counters = self.counters[(view, method)]
+            for i, value in enumerate(values):
+                counters[i] += value
+
+    def render(self, prefix="dboe"):
+        """The counters in the Prometheus text exposition format."""
+        with self.lock:
+            counters = sorted(self.counters.items())
+        lines = []
+        for i, (name, description) in enumerate(METRICS):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for (view, method), values in counters:
+                labels = f'view="{view}",method="{method}"'
+                lines.append(f"{prefix}_{name}{{{labels}}} {values[i]}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def get_view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match.route
+
+
+class QueryMetricsMiddleware:
+    """Records the number and time of the database queries, the rendering time and
+    the response size of every request.
+
+    The timings are sent in a ``Server-Timing`` header and summed up per view in
+    ``registry``, see ``metrics``. Requests exceeding the ``query_budget`` of their
+    view class (default: ``settings.QUERY_BUDGET``) log a warning; the queries of
+    the response cache (see ``cache_queries``) are counted separately.
+    Queries of streaming responses run after the middleware and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.query_metrics = RequestMetrics()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.total_seconds = perf_counter() - start
+        if not response.streaming:
+            metrics.size = len(response.content)
+        response["Server-Timing"] = metrics.server_timing()
+
+        view = get_view_name(request)
+        registry.add(view, request.method, metrics)
+        if metrics.budget is not None and metrics.queries > metrics.budget:
+            logger.warning(
+                "%s %s: %s queries exceed the budget of %s",
+                request.method,
+                view,
+                metrics.queries,
+                metrics.budget,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF views (also @api_view functions) and class based views
+        view_class = getattr(view_func, "cls", getattr(view_func, "view_class", None))
+        if view_class is not None:
+            request.query_metrics.budget = getattr(
+                view_class, "query_budget", settings.QUERY_BUDGET
+            )
+
+    def process_template_response(self, request, response):
+        # called right before the response (e.g. a DRF Response) is rendered
+        start = perf_counter()
+
+        def rendered(response):
+            request.query_metrics.serialize_seconds += perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics(request):
+    """The request metrics of this process for Prometheus.
+
+    Only for staff users or requests with the header
+    ``Authorization: Bearer <settings.METRICS_TOKEN>`` (if a token is set).
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if not request.user.is_staff and not (
+        token and secrets.compare_digest(authorization, f"Bearer {token}")
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,17 @@
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from dboeannotation.renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser using orjson; the request body has to be UTF-8 encoded."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
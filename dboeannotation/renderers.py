@@ -0,0 +1,56 @@
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+# naive datetimes are rendered as they are, UTC ones with a "Z" suffix like DRF does
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def orjson_default(obj):
+    """Convert the objects orjson cannot serialize, like DRF's ``JSONEncoder``."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    elif isinstance(obj, decimal.Decimal):
+        # serializers coerce decimals to strings by default
+        return float(obj)
+    elif isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    elif isinstance(obj, QuerySet):
+        return list(obj)
+    elif isinstance(obj, bytes):
+        return obj.decode()
+    elif hasattr(obj, "tolist"):
+        return obj.tolist()
+    elif hasattr(obj, "keys"):
+        return dict(obj)
+    elif hasattr(obj, "__iter__"):
+        # e.g. the dict_values returned by CollectionSerializer.get_tags
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    ret = orjson.dumps(data, default=orjson_default, option=ORJSON_OPTIONS)
+    # like JSONRenderer, escape line and paragraph separators, so the output
+    # is a strict javascript subset
+    return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson for compact output.
+
+    Indented output (e.g. ``Accept: application/json; indent=4`` or the
+    browsable API) is rendered by ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
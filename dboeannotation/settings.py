@@ -60,6 +60,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "dboeannotation.middleware.QueryMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -69,6 +70,12 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+# maximum number of database queries per request, unless the view sets query_budget;
+# requests exceeding it are logged (see dboeannotation/middleware.py)
+QUERY_BUDGET = 6
+# token of the Prometheus scraper for /metrics/ (sent as "Authorization: Bearer <token>"),
+# without it the metrics are only shown to staff users
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
 CORS_ALLOW_ALL_ORIGINS = True
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
@@ -117,6 +124,64 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "dboeannotation.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "dboeannotation.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# the "api" cache holds the responses of the read only endpoints (see dboeannotation/api_cache.py),
+# API_CACHE_URL selects the backend: unset (local memory), file:///path/to/dir or redis://host:port/db.
+# The versions invalidating the responses have to be shared by all processes (gunicorn workers,
+# management commands), with a local memory cache they are kept in the database table "api_cache"
+# (see `manage.py createcachetable`)
+
+API_CACHE_URL = os.environ.get("API_CACHE_URL", "")
+if API_CACHE_URL.startswith(("redis://", "rediss://")):
+    API_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": API_CACHE_URL,
+    }
+elif API_CACHE_URL.startswith("file://"):
+    API_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": API_CACHE_URL.removeprefix("file://"),
+    }
+else:
+    API_CACHE = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api",
+    }
+
+if API_CACHE["BACKEND"].endswith("LocMemCache"):
+    API_VERSION_CACHE = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "api_cache",
+    }
+else:
+    API_VERSION_CACHE = API_CACHE
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "api": API_CACHE,
+    "api_versions": API_VERSION_CACHE,
+}
+
+# time to live of the cached responses in seconds per group of endpoints;
+# changes to the underlying models drop the cached responses immediately
+API_CACHE_TIMEOUTS = {
+    "default": 60 * 5,
+    "siglen": 60 * 60 * 24,
+    "categories": 60 * 60 * 24,
+    "tags": 60 * 60,
+    "stats": 60 * 15,
 }
 
 SPAGHETTI_SAUCE = {
@@ -11,6 +11,7 @@ from rest_framework.authtoken import views
 
 from annotations import api_views
 from belege import api_views as belege_api_views
+from dboeannotation.middleware import metrics
 from siglen import api_views as siglen_api_views
 
 router = routers.DefaultRouter()
@@ -48,6 +49,7 @@ urlpatterns = [
     path("api-token-auth/", views.obtain_auth_token),
     path("authenticate/", api_views.CustomObtainAuthToken.as_view()),
     path("project-info/", api_views.project_info),
+    path("metrics/", metrics, name="metrics"),
     path("api/dboe-query/", api_views.dboe_query),
     path(
         "api/dboe-query-by-id/<str:dboe_id>",
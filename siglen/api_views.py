@@ -1,15 +1,14 @@
-from django.conf import settings
-from django.db import reset_queries
 from rest_framework import viewsets
 
-from belege.api_views import CustomPagination
-from belege.query_utils import log_query_count
+from belege.pagination import CustomPagination
+from dboeannotation.api_cache import CachedResponseMixin
 from siglen.filters import BelegSigleFilter, SigleFilter
 from siglen.models import BelegSigle, Sigle
 from siglen.serializers import BelegSigleSerializer, SigleSerializer
 
 
-class SigleViewSet(viewsets.ModelViewSet):
+class SigleViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    cache_group = "siglen"
     pagination_class = CustomPagination
     queryset = Sigle.objects.all()
     serializer_class = SigleSerializer
@@ -17,23 +16,9 @@ class SigleViewSet(viewsets.ModelViewSet):
     lookup_field = "sigle"
     lookup_value_regex = r"[^/]+"
 
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
-
 
 class BeleSigleViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPagination
     queryset = BelegSigle.objects.all()
     serializer_class = BelegSigleSerializer
     filterset_class = BelegSigleFilter
-
-    def list(self, request, *args, **kwargs):
-        reset_queries()
-        response = super().list(request, *args, **kwargs)
-        if settings.DEBUG:
-            log_query_count(full_log=False)
-        return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SiglenConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "siglen"
+
+    def ready(self):
+        import siglen.signals  # noqa: F401
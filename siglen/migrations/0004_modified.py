@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("siglen", "0003_alter_sigle_orig_names"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="belegsigle",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sigle",
+            name="modified",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp of the last change",
+                verbose_name="Modified",
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django_jsonform.models.fields import ArrayField
 
 sigle_kinds = (
@@ -49,6 +50,13 @@ class Sigle(models.Model):
         related_name="has_kr",
         verbose_name="Kleinregion",
     )
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
 
     class Meta:
         verbose_name = "Sigle"
@@ -60,6 +68,7 @@ class Sigle(models.Model):
 
     def save(self, *args, **kwargs):
         self.orig_names = list(set(self.orig_names))
+        self.modified = timezone.now()
         super().save(*args, **kwargs)
 
 
@@ -72,6 +81,13 @@ class BelegSigle(models.Model):
         max_length=50, blank=True, null=True, verbose_name="@corrsp"
     )
     resp = models.CharField(max_length=50, blank=True, null=True, verbose_name="@resp")
+    modified = models.DateTimeField(
+        editable=False,
+        db_index=True,
+        default=timezone.now,
+        verbose_name="Modified",
+        help_text="Timestamp of the last change",
+    )
 
     class Meta:
         verbose_name = "Beleg-Sigle"
@@ -80,3 +96,7 @@ class BelegSigle(models.Model):
 
     def __str__(self):
         return f"{self.sigle} ({self.beleg}) {self.corresp}"
+
+    def save(self, *args, **kwargs):
+        self.modified = timezone.now()
+        super().save(*args, **kwargs)
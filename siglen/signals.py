@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dboeannotation.api_cache import invalidate_on_commit
+from siglen.models import Sigle
+
+
+@receiver(post_save, sender=Sigle)
+@receiver(post_delete, sender=Sigle)
+def invalidate_siglen(sender, **kwargs):
+    invalidate_on_commit("siglen")
@@ -3,4 +3,5 @@ echo "Hello from Project dboeannotation"
 uv run manage.py collectstatic --no-input
 echo "running migrations"
 uv run manage.py migrate --no-input
+uv run manage.py createcachetable
 uv run gunicorn dboeannotation.wsgi --user www-data --bind 0.0.0.0:8010 --workers 3 & nginx -g "daemon off;"
\ No newline at end of file
@@ -1,3 +1,4 @@
 #!/bin/sh
 python manage.py migrate &&\
+python manage.py createcachetable &&\
 exec gunicorn dboeannotation.wsgi
\ No newline at end of file
@@ -0,0 +1,34 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from stats.refresh import (
+    REFRESH_BATCH_SIZE,
+    refresh_beleg_stats,
+    refresh_collection_stats,
+    refresh_tag_stats,
+)
+
+
+class Command(BaseCommand):
+    help = "recounts the precomputed statistics of all Belege, Collections and Tags"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help=f"Number of rows written per query (default: {REFRESH_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        for label, refresh in [
+            ("Belege", refresh_beleg_stats),
+            ("Collections", refresh_collection_stats),
+            ("Tags", refresh_tag_stats),
+        ]:
+            start = perf_counter()
+            count = refresh(batch_size=options["batch_size"])
+            self.stdout.write(
+                f"refreshed {count} {label} in {perf_counter() - start:.1f}s"
+            )
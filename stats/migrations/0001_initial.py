@@ -0,0 +1,159 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("annotations", "0011_tag_modified"),
+        ("belege", "0053_beleg_representation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BelegStats",
+            fields=[
+                (
+                    "beleg",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="belege.beleg",
+                        verbose_name="Beleg",
+                    ),
+                ),
+                (
+                    "facs",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Faksimiles"
+                    ),
+                ),
+                (
+                    "note_lautung",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Anmerkungen (Lautung)"
+                    ),
+                ),
+                (
+                    "bedeutungen",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Bedeutungen"
+                    ),
+                ),
+                (
+                    "lehnwoerter",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Lehnwörter"
+                    ),
+                ),
+                (
+                    "lautungen",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Lautungen"
+                    ),
+                ),
+                (
+                    "citations",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Kontexte"
+                    ),
+                ),
+                (
+                    "collection",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Collections"
+                    ),
+                ),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        help_text="Timestamp of the last count",
+                        verbose_name="Refreshed at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Beleg-Statistik",
+                "verbose_name_plural": "Beleg-Statistiken",
+            },
+        ),
+        migrations.CreateModel(
+            name="CollectionStats",
+            fields=[
+                (
+                    "collection",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="annotations.collection",
+                        verbose_name="Collection",
+                    ),
+                ),
+                (
+                    "belege",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Belege"
+                    ),
+                ),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        help_text="Timestamp of the last count",
+                        verbose_name="Refreshed at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Collection-Statistik",
+                "verbose_name_plural": "Collection-Statistiken",
+            },
+        ),
+        migrations.CreateModel(
+            name="TagStats",
+            fields=[
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="annotations.tag",
+                        verbose_name="Tag",
+                    ),
+                ),
+                (
+                    "belege",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Belege"
+                    ),
+                ),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        help_text="Timestamp of the last count",
+                        verbose_name="Refreshed at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tag-Statistik",
+                "verbose_name_plural": "Tag-Statistiken",
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+from itertools import batched
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# rows inserted per query
+BATCH_SIZE = 5000
+
+
+def count_of(model, field):
+    """Number of ``model`` rows pointing with ``field`` to the outer row."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def fill(stats_model, key, model, counts):
+    """Count ``counts`` for all rows of ``model`` without stats yet."""
+    now = timezone.now()
+    rows = (
+        model.objects.order_by()
+        .exclude(pk__in=stats_model.objects.values(key))
+        .annotate(**{f"count_{name}": value for name, value in counts.items()})
+        .values_list("pk", *(f"count_{name}" for name in counts))
+    )
+    for batch in batched(rows.iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+        stats_model.objects.bulk_create(
+            [
+                stats_model(
+                    **{f"{key}_id": pk}, **dict(zip(counts, values)), refreshed_at=now
+                )
+                for pk, *values in batch
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def backfill_stats(apps, schema_editor):
+    """Count the existing Belege, Collections and Tags, later changes are counted
+    by the signal handlers in stats/signals.py."""
+    Beleg = apps.get_model("belege", "Beleg")
+    collection_through = Beleg._meta.get_field("collection").remote_field.through
+    tag_through = Beleg._meta.get_field("tag").remote_field.through
+    counts = {
+        "facs": count_of(apps.get_model("belege", "BelegFacs"), "beleg"),
+        "note_lautung": count_of(apps.get_model("belege", "AnmerkungLautung"), "beleg"),
+        "bedeutungen": count_of(apps.get_model("belege", "Sense"), "beleg"),
+        "lehnwoerter": count_of(apps.get_model("belege", "LehnWort"), "beleg"),
+        "lautungen": count_of(apps.get_model("belege", "Lautung"), "beleg"),
+        "citations": count_of(apps.get_model("belege", "Citation"), "beleg"),
+        "collection": count_of(collection_through, "beleg"),
+    }
+    fill(apps.get_model("stats", "BelegStats"), "beleg", Beleg, counts)
+    fill(
+        apps.get_model("stats", "CollectionStats"),
+        "collection",
+        apps.get_model("annotations", "Collection"),
+        {"belege": count_of(collection_through, "collection")},
+    )
+    fill(
+        apps.get_model("stats", "TagStats"),
+        "tag",
+        apps.get_model("annotations", "Tag"),
+        {"belege": count_of(tag_through, "tag")},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annotations", "0011_tag_modified"),
+        ("belege", "0055_alter_lautung_dboe_id_alter_lehnwort_dboe_id"),
+        ("stats", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
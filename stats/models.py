@@ -1,2 +1,104 @@
+from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class BelegStats(models.Model):
+    """Number of related objects per Beleg, kept up to date by ``stats.refresh``."""
+
+    beleg = models.OneToOneField(
+        "belege.Beleg",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="stats",
+        verbose_name="Beleg",
+    )
+    facs = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Faksimiles"
+    )
+    note_lautung = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Anmerkungen (Lautung)"
+    )
+    bedeutungen = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Bedeutungen"
+    )
+    lehnwoerter = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Lehnwörter"
+    )
+    lautungen = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Lautungen"
+    )
+    citations = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Kontexte"
+    )
+    collection = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Collections"
+    )
+    refreshed_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Refreshed at",
+        help_text="Timestamp of the last count",
+    )
+
+    class Meta:
+        verbose_name = "Beleg-Statistik"
+        verbose_name_plural = "Beleg-Statistiken"
+
+    def __str__(self):
+        return f"{self.beleg_id}"
+
+
+class CollectionStats(models.Model):
+    """Number of Belege per Collection, kept up to date by ``stats.refresh``."""
+
+    collection = models.OneToOneField(
+        "annotations.Collection",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="stats",
+        verbose_name="Collection",
+    )
+    belege = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Belege"
+    )
+    refreshed_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Refreshed at",
+        help_text="Timestamp of the last count",
+    )
+
+    class Meta:
+        verbose_name = "Collection-Statistik"
+        verbose_name_plural = "Collection-Statistiken"
+
+    def __str__(self):
+        return f"{self.collection_id}"
+
+
+class TagStats(models.Model):
+    """Number of Belege per Tag, kept up to date by ``stats.refresh``."""
+
+    tag = models.OneToOneField(
+        "annotations.Tag",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="stats",
+        verbose_name="Tag",
+    )
+    belege = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name="Belege"
+    )
+    refreshed_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Refreshed at",
+        help_text="Timestamp of the last count",
+    )
+
+    class Meta:
+        verbose_name = "Tag-Statistik"
+        verbose_name_plural = "Tag-Statistiken"
+
+    def __str__(self):
+        return f"{self.tag_id}"
@@ -0,0 +1,97 @@
+from itertools import batched
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from annotations.models import Collection, Tag
+from belege.models import (
+    AnmerkungLautung,
+    Beleg,
+    BelegFacs,
+    Citation,
+    Lautung,
+    LehnWort,
+    Sense,
+)
+from dboeannotation.api_cache import invalidate
+from stats.models import BelegStats, CollectionStats, TagStats
+
+# rows upserted per query
+REFRESH_BATCH_SIZE = 5000
+
+
+def count_of(model, field):
+    """Number of ``model`` rows pointing with ``field`` to the outer row."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def beleg_counts():
+    return {
+        "facs": count_of(BelegFacs, "beleg"),
+        "note_lautung": count_of(AnmerkungLautung, "beleg"),
+        "bedeutungen": count_of(Sense, "beleg"),
+        "lehnwoerter": count_of(LehnWort, "beleg"),
+        "lautungen": count_of(Lautung, "beleg"),
+        "citations": count_of(Citation, "beleg"),
+        "collection": count_of(Beleg.collection.through, "beleg"),
+    }
+
+
+def upsert(stats_model, key, queryset, counts, batch_size):
+    """Count ``counts`` for the rows of ``queryset`` and store them in ``stats_model``."""
+    now = timezone.now()
+    # the counts are annotated with a prefix, they share their names with relations
+    rows = (
+        queryset.order_by()
+        .annotate(**{f"count_{name}": value for name, value in counts.items()})
+        .values_list("pk", *(f"count_{name}" for name in counts))
+    )
+    refreshed = 0
+    for batch in batched(rows.iterator(chunk_size=batch_size), batch_size):
+        stats_model.objects.bulk_create(
+            [
+                stats_model(
+                    **{f"{key}_id": pk}, **dict(zip(counts, values)), refreshed_at=now
+                )
+                for pk, *values in batch
+            ],
+            update_conflicts=True,
+            unique_fields=[key],
+            update_fields=[*counts, "refreshed_at"],
+        )
+        refreshed += len(batch)
+    invalidate("stats")
+    return refreshed
+
+
+def refresh_beleg_stats(queryset=None, batch_size=REFRESH_BATCH_SIZE):
+    """Recount the related objects of the Belege of ``queryset`` (default: all)."""
+    if queryset is None:
+        queryset = Beleg.objects.all()
+    return upsert(BelegStats, "beleg", queryset, beleg_counts(), batch_size)
+
+
+def refresh_collection_stats(queryset=None, batch_size=REFRESH_BATCH_SIZE):
+    """Recount the Belege of the Collections of ``queryset`` (default: all)."""
+    if queryset is None:
+        queryset = Collection.objects.all()
+    counts = {"belege": count_of(Beleg.collection.through, "collection")}
+    return upsert(CollectionStats, "collection", queryset, counts, batch_size)
+
+
+def refresh_tag_stats(queryset=None, batch_size=REFRESH_BATCH_SIZE):
+    """Recount the Belege of the Tags of ``queryset`` (default: all)."""
+    if queryset is None:
+        queryset = Tag.objects.all()
+    counts = {"belege": count_of(Beleg.tag.through, "tag")}
+    return upsert(TagStats, "tag", queryset, counts, batch_size)
@@ -0,0 +1,102 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from annotations.models import Collection, Tag
+from belege.models import (
+    AnmerkungLautung,
+    Beleg,
+    BelegFacs,
+    Citation,
+    Lautung,
+    LehnWort,
+    Sense,
+    deleted_with,
+    syncing_children,
+)
+from stats.refresh import (
+    refresh_beleg_stats,
+    refresh_collection_stats,
+    refresh_tag_stats,
+)
+
+
+def refresh_on_commit(dboe_ids=(), collection_ids=(), tag_ids=()):
+    """Recount the given Belege, Collections and Tags once the transaction is committed.
+
+    Beleg.save() syncs its children after the Beleg row is saved, so the
+    counts are only correct after the commit.
+    """
+    dboe_ids = list(dboe_ids)
+    collection_ids = list(collection_ids)
+    tag_ids = list(tag_ids)
+
+    def refresh():
+        if dboe_ids:
+            refresh_beleg_stats(Beleg.objects.filter(pk__in=dboe_ids))
+        if collection_ids:
+            refresh_collection_stats(Collection.objects.filter(pk__in=collection_ids))
+        if tag_ids:
+            refresh_tag_stats(Tag.objects.filter(pk__in=tag_ids))
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Beleg)
+def refresh_saved_beleg(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_on_commit(dboe_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=Beleg)
+def refresh_deleted_beleg(sender, instance, **kwargs):
+    """The links to collections and tags are deleted without m2m_changed"""
+    refresh_on_commit(
+        collection_ids=instance.collection.values_list("pk", flat=True),
+        tag_ids=instance.tag.values_list("pk", flat=True),
+    )
+
+
+@receiver(post_save, sender=AnmerkungLautung)
+@receiver(post_save, sender=BelegFacs)
+@receiver(post_save, sender=Citation)
+@receiver(post_save, sender=Lautung)
+@receiver(post_save, sender=LehnWort)
+@receiver(post_save, sender=Sense)
+@receiver(post_delete, sender=AnmerkungLautung)
+@receiver(post_delete, sender=BelegFacs)
+@receiver(post_delete, sender=Citation)
+@receiver(post_delete, sender=Lautung)
+@receiver(post_delete, sender=LehnWort)
+@receiver(post_delete, sender=Sense)
+def refresh_parent_beleg(
+    sender, instance, created=True, raw=False, origin=None, **kwargs
+):
+    if syncing_children.get() or deleted_with(origin, Beleg):
+        return
+    if created and not raw and instance.beleg_id:
+        refresh_on_commit(dboe_ids=[instance.beleg_id])
+
+
+@receiver(m2m_changed, sender=Beleg.collection.through)
+def refresh_collected_belege(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        dboe_ids = [instance.pk]
+        collection_ids = pk_set or instance.collection.values_list("pk", flat=True)
+    else:
+        dboe_ids = pk_set or instance.beleg.values_list("pk", flat=True)
+        collection_ids = [instance.pk]
+    refresh_on_commit(dboe_ids=dboe_ids, collection_ids=collection_ids)
+
+
+@receiver(m2m_changed, sender=Beleg.tag.through)
+def refresh_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        tag_ids = pk_set or instance.tag.values_list("pk", flat=True)
+    else:
+        tag_ids = [instance.pk]
+    refresh_on_commit(tag_ids=tag_ids)
@@ -1,115 +1,120 @@
-from django.db.models import Count, F
+from django.db.models import F, Max
 from drf_spectacular.utils import extend_schema
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from annotations.models import Collection, Tag
-from belege.models import Beleg
+from dboeannotation.api_cache import cache_response
+from stats.models import BelegStats, CollectionStats, TagStats
 
+# number of items returned by the views
+TOP_N = 25
 
+
+def refreshed_at(stats_model):
+    """Timestamp of the most recent count stored in ``stats_model``."""
+    return stats_model.objects.aggregate(x=Max("refreshed_at"))["x"]
+
+
+def top_belege(field, title):
+    """The Belege with the most related objects counted in ``BelegStats.<field>``."""
+    payload = list(
+        BelegStats.objects.filter(**{f"{field}__gt": 0})
+        .order_by(f"-{field}")[:TOP_N]
+        .values(id=F("beleg_id"), value=F("beleg__hauptlemma"), item_count=F(field))
+    )
+    return Response(
+        {
+            "title": title,
+            "refreshed_at": refreshed_at(BelegStats),
+            "payload": payload,
+        }
+    )
+
+
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_facs_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("facs"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Faksimiles)", "payload": payload})
+    return top_belege("facs", "Belege nach Faksimiles)")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_note_lautung_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("note_lautung"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Anmerkungen(Lautung)", "payload": payload})
+    return top_belege("note_lautung", "Belege nach Anmerkungen(Lautung)")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_sense_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("bedeutungen"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Bedeutungen", "payload": payload})
+    return top_belege("bedeutungen", "Belege nach Bedeutungen")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_lehnwort_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("lehnwoerter"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Lehnwörtern", "payload": payload})
+    return top_belege("lehnwoerter", "Belege nach Lehnwörtern")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_lautung_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("lautungen"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Lautungen", "payload": payload})
+    return top_belege("lautungen", "Belege nach Lautungen")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_context_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("citations"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Kontexten", "payload": payload})
+    return top_belege("citations", "Belege nach Kontexten")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def collection_by_beleg_count(request):
     payload = list(
-        Collection.objects.annotate(item_count=Count("beleg"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values("id", value=F("title"), item_count=F("item_count"))
+        CollectionStats.objects.filter(belege__gt=0)
+        .order_by("-belege")[:TOP_N]
+        .values(
+            id=F("collection_id"),
+            value=F("collection__title"),
+            item_count=F("belege"),
+        )
+    )
+    return Response(
+        {
+            "title": "Collection nach Belegen",
+            "refreshed_at": refreshed_at(CollectionStats),
+            "payload": payload,
+        }
     )
-    return Response({"title": "Collection nach Belegen", "payload": payload})
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def beleg_by_collection_count(request):
-    payload = list(
-        Beleg.objects.annotate(item_count=Count("collection"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values(id=F("dboe_id"), value=F("hauptlemma"), item_count=F("item_count"))
-    )
-    return Response({"title": "Belege nach Collections", "payload": payload})
+    return top_belege("collection", "Belege nach Collections")
 
 
+@cache_response("stats")
 @extend_schema(responses=dict)
 @api_view(["get"])
 def tag_by_beleg_count(request) -> dict:
     payload = list(
-        Tag.objects.annotate(item_count=Count("belege"))
-        .filter(item_count__gt=0)
-        .order_by("-item_count")[:25]
-        .values("id", value=F("name"), item_count=F("item_count"))
+        TagStats.objects.filter(belege__gt=0)
+        .order_by("-belege")[:TOP_N]
+        .values(id=F("tag_id"), value=F("tag__name"), item_count=F("belege"))
+    )
+    return Response(
+        {
+            "title": "Tags nach Belegen",
+            "refreshed_at": refreshed_at(TagStats),
+            "payload": payload,
+        }
     )
-    return Response({"title": "Tags nach Belegen", "payload": payload})